@@ -0,0 +1,206 @@
+"""
+Бенчмарк горячих путей Product и Category на синтетических каталогах.
+
+Для каждой операции и размера каталога измеряются пропускная
+способность, процентили задержки одного вызова и пиковая память.
+Результаты сохраняются в JSON и сравниваются с базовым прогоном.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_catalog --sizes 1000 10000 100000 1000000 \\
+        --save benchmarks/results/baseline.json
+    python -m benchmarks.bench_catalog --compare benchmarks/results/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from functools import partial
+
+from src.main import Category, Product, ProductRegistry
+from src.repricing import ApprovePolicy
+from .common import make_records, percentile, quiet
+
+# Сколько раз читать Category.products за один замер
+MAX_READS = 1000
+
+
+def setup_new_product(size):
+    """Product.new_product с реестром: 20% записей — дубликаты."""
+    registry = ProductRegistry()
+    records = make_records(size, unique=max(1, size * 4 // 5))
+    return partial(Product.new_product, products_list=registry), records
+
+
+def setup_add_product(size):
+    """Category.add_product по одному товару."""
+    category = Category("Бенчмарк", "Синтетическая категория", [])
+    products = [Product(record["name"], record["description"], record["price"],
+                        record["quantity"]) for record in make_records(size)]
+    return category.add_product, products
+
+
+def _filled_category(size):
+    return Category("Бенчмарк", "Синтетическая категория",
+                    [Product(record["name"], record["description"], record["price"],
+                             record["quantity"]) for record in make_records(size)])
+
+
+def setup_products_read(size):
+    """Чтение Category.products после изменения остатка одного товара."""
+    category = _filled_category(size)
+    products = list(category)
+
+    def read(index):
+        products[index].quantity += 1
+        return category.products[index]
+
+    return read, range(min(size, MAX_READS))
+
+
+def setup_products_export(size):
+    """Полная выгрузка list(Category.products)."""
+    category = _filled_category(size)
+    reads = max(1, min(MAX_READS, 10 ** 6 // size))
+    return lambda _: list(category.products), range(reads)
+
+
+def setup_price_increase(size):
+    """Повышение цены через сеттер price у товаров категории."""
+    products = list(_filled_category(size))
+    return lambda product: setattr(product, "price", product.price + 1.0), products
+
+
+def setup_price_decrease(size):
+    """Понижение цены через set_price с политикой согласования."""
+    products = list(_filled_category(size))
+    policy = ApprovePolicy()
+    return lambda product: product.set_price(product.price / 2, policy), products
+
+
+OPERATIONS = {
+    "new_product": setup_new_product,
+    "add_product": setup_add_product,
+    "products_read": setup_products_read,
+    "products_export": setup_products_export,
+    "price_increase": setup_price_increase,
+    "price_decrease": setup_price_decrease,
+}
+
+
+def measure(setup, size):
+    """Замеряет задержку каждого вызова операции."""
+    Category.reset_counts()
+    call, arguments = setup(size)
+    latencies = []
+    with quiet():
+        started = time.perf_counter_ns()
+        for argument in arguments:
+            call_started = time.perf_counter_ns()
+            call(argument)
+            latencies.append(time.perf_counter_ns() - call_started)
+        elapsed = time.perf_counter_ns() - started
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "throughput_per_s": len(latencies) / (elapsed / 1e9) if elapsed else 0.0,
+        "p50_us": percentile(latencies, 0.50) / 1e3,
+        "p95_us": percentile(latencies, 0.95) / 1e3,
+        "p99_us": percentile(latencies, 0.99) / 1e3,
+        "max_us": latencies[-1] / 1e3 if latencies else 0.0,
+    }
+
+
+def measure_memory(setup, size):
+    """Пиковая память подготовки каталога и выполнения операции, в байтах."""
+    Category.reset_counts()
+    tracemalloc.start()
+    try:
+        call, arguments = setup(size)
+        with quiet():
+            for argument in arguments:
+                call(argument)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(sizes, operations, with_memory=True):
+    """Выполняет бенчмарк и возвращает результаты в виде словаря."""
+    results = []
+    for size in sizes:
+        for name in operations:
+            result = {"operation": name, "size": size, **measure(OPERATIONS[name], size)}
+            if with_memory:
+                result["peak_memory_bytes"] = measure_memory(OPERATIONS[name], size)
+            results.append(result)
+            print_result(result)
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def print_result(result):
+    memory = result.get("peak_memory_bytes")
+    memory = f"{memory / 2 ** 20:9.1f}" if memory is not None else f"{'—':>9}"
+    print(f"{result['operation']:<16} {result['size']:>8} {result['throughput_per_s']:>12.0f} "
+          f"{result['p50_us']:>9.1f} {result['p95_us']:>9.1f} {result['p99_us']:>9.1f} {memory}")
+
+
+def compare(current, baseline, tolerance):
+    """
+    Сравнивает пропускную способность с базовым прогоном.
+    Возвращает список регрессий: (операция, размер, было, стало).
+    """
+    previous = {(result["operation"], result["size"]): result
+                for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = previous.get((result["operation"], result["size"]))
+        if old and result["throughput_per_s"] < old["throughput_per_s"] * (1 - tolerance):
+            regressions.append((result["operation"], result["size"],
+                                old["throughput_per_s"], result["throughput_per_s"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--operations", nargs="+", choices=sorted(OPERATIONS),
+                        default=list(OPERATIONS))
+    parser.add_argument("--no-memory", action="store_true",
+                        help="не измерять пиковую память (tracemalloc замедляет прогон)")
+    parser.add_argument("--save", help="сохранить результаты в JSON-файл")
+    parser.add_argument("--compare", help="сравнить с результатами из JSON-файла")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="допустимое падение пропускной способности (доля)")
+    args = parser.parse_args()
+
+    print(f"{'операция':<16} {'размер':>8} {'вызовов/с':>12} "
+          f"{'p50 мкс':>9} {'p95 мкс':>9} {'p99 мкс':>9} {'пик МБ':>9}")
+    current = run(args.sizes, args.operations, with_memory=not args.no_memory)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(current, file, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = compare(current, json.load(file), args.tolerance)
+        for operation, size, old, new in regressions:
+            print(f"Регрессия: {operation} ({size}): {old:.0f} -> {new:.0f} вызовов/с")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
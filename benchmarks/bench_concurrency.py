@@ -0,0 +1,53 @@
+"""
+Бенчмарк пропускной способности Category.merge_product
+при слиянии из пула потоков.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_concurrency --records 200000 --workers 1 2 4 8
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.main import Category
+from .common import make_records, quiet
+
+
+def run(records, workers, chunk_size):
+    """Сливает записи в одну категорию и возвращает время в секундах."""
+    Category.reset_counts()
+    category = Category("Бенчмарк", "Синтетическая категория", [])
+    chunks = [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+    # Сообщения о дубликатах не должны влиять на замер
+    with quiet():
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(category.merge_products, chunks))
+        elapsed = time.perf_counter() - started
+    # Проверяем, что счетчики и остатки не разошлись
+    assert Category.product_count == len(category)
+    assert sum(product.quantity for product in category) == sum(
+        record["quantity"] for record in records)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--unique", type=int, default=50_000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    records = make_records(args.records, args.unique)
+    baseline = None
+    print(f"{'потоков':>8} {'записей/с':>12} {'ускорение':>10}")
+    for workers in args.workers:
+        elapsed = run(records, workers, args.chunk_size)
+        throughput = len(records) / elapsed
+        baseline = baseline or throughput
+        print(f"{workers:>8} {throughput:>12.0f} {throughput / baseline:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""Общие помощники бенчмарков: синтетические данные и статистика."""
+import os
+from contextlib import contextmanager, redirect_stdout
+
+# Процентили считаются так же, как в статистике Profiler
+from src.instrumentation import percentile  # noqa: F401
+
+
+def make_records(count, unique=None):
+    """
+    Синтетический поток записей о товарах. При unique < count
+    имена повторяются и часть записей становится дубликатами.
+    """
+    unique = unique or count
+    return [{"name": f"Товар {i % unique}", "description": f"Описание {i % 97}",
+             "price": float(i % 1000 + 1), "quantity": i % 10 + 1} for i in range(count)]
+
+
+@contextmanager
+def quiet():
+    """Подавляет вывод в stdout, чтобы сообщения не влияли на замер."""
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        yield
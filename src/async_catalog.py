@@ -0,0 +1,173 @@
+"""
+Асинхронный фасад над Category для потоков обновлений цен и остатков.
+
+Производители отправляют обновления в ограниченную очередь
+(при заполнении submit ждет — обратное давление), а фоновая задача
+объединяет их в пакеты и применяет к объектам Category/Product.
+Интерактивный ввод не используется: понижение цены согласуется
+с политикой из src/repricing.py.
+"""
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+
+from .repricing import RejectPolicy, reprice
+
+
+@dataclass(frozen=True)
+class NewProduct:
+    """Запись о товаре для слияния по правилам new_product."""
+
+    product_data: dict
+
+
+@dataclass(frozen=True)
+class StockUpdate:
+    """Изменение остатка товара на quantity_delta штук."""
+
+    name: str
+    quantity_delta: int
+
+
+@dataclass(frozen=True)
+class PriceUpdate:
+    """Новая цена товара."""
+
+    name: str
+    price: float
+
+
+UPDATE_TYPES = (NewProduct, StockUpdate, PriceUpdate)
+
+
+class AsyncCatalogService:
+    """
+    Сервис обновлений одной категории.
+
+    Обновления применяются в порядке поступления; в пределах пакета
+    изменения остатков одного товара суммируются и записываются одним
+    присваиванием. Результат не зависит от того, как очередь разбита
+    на пакеты. Итоги копятся в stats, ошибки обновлений — в errors
+    парами (обновление, исключение); ошибка не останавливает обработку.
+    """
+
+    def __init__(self, category, max_queue=1000, batch_size=500, policy=None):
+        self.category = category
+        self.batch_size = batch_size
+        self.policy = policy if policy is not None else RejectPolicy()
+        self.stats = Counter()
+        self.errors = []
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._worker = None
+
+    async def start(self):
+        """Запускает фоновую обработку очереди."""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def submit(self, update):
+        """Ставит обновление в очередь; ждет, если очередь заполнена."""
+        if not isinstance(update, UPDATE_TYPES):
+            raise TypeError(f"Неизвестный тип обновления: {type(update).__name__}.")
+        await self._queue.put(update)
+
+    async def consume(self, updates):
+        """Ставит в очередь все обновления из асинхронного итератора."""
+        async for update in updates:
+            await self.submit(update)
+
+    async def flush(self):
+        """
+        Ждет применения всех обновлений, поставленных в очередь.
+        Если обработка еще не запущена, запускает ее.
+        """
+        await self.start()
+        await self._queue.join()
+
+    async def close(self):
+        """Применяет оставшиеся обновления и останавливает обработку."""
+        if self._worker is None and self._queue.empty():
+            return
+        await self.flush()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                self._apply(batch)
+            except Exception as exc:
+                # Обработчик не должен останавливаться, иначе flush() зависнет
+                self.errors.extend((update, exc) for update in batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _apply(self, batch):
+        """
+        Применяет пакет обновлений к категории в порядке поступления.
+        Изменения остатков копятся и записываются перед следующим новым
+        товаром (он может создать товар, к которому они относятся)
+        и в конце пакета — так же, как при поочередном применении.
+        """
+        deltas = {}
+        for update in batch:
+            try:
+                if isinstance(update, StockUpdate):
+                    pending = deltas.setdefault(update.name, [0, []])
+                    pending[0] += update.quantity_delta
+                    pending[1].append(update)
+                elif isinstance(update, PriceUpdate):
+                    self._apply_price(update)
+                elif isinstance(update, NewProduct):
+                    self._apply_deltas(deltas)
+                    self.category.merge_product(update.product_data)
+                else:
+                    raise TypeError(f"Неизвестный тип обновления: {type(update).__name__}.")
+            except Exception as exc:
+                self.errors.append((update, exc))
+        self._apply_deltas(deltas)
+        self.stats["batches"] += 1
+        self.stats["updates"] += len(batch)
+
+    def _apply_deltas(self, deltas):
+        """
+        Записывает накопленные изменения остатков и очищает deltas
+        (имя -> [суммарное изменение, исходные обновления]). Пропущенные
+        и ошибочные обновления учитываются по одному, как без объединения.
+        """
+        for name, (delta, updates) in deltas.items():
+            try:
+                product = self.category.find_product(name)
+                if product is None:
+                    self.stats["missing"] += len(updates)
+                elif delta:
+                    product.quantity += delta
+            except Exception as exc:
+                self.errors.extend((update, exc) for update in updates)
+        deltas.clear()
+
+    def _apply_price(self, update):
+        """Применяет новую цену товара с учетом политики."""
+        report = reprice(self.category, [(update.name, update.price)], self.policy)
+        self.stats["price_applied"] += len(report.applied)
+        self.stats["price_rejected"] += len(report.rejected)
+        self.stats["price_invalid"] += len(report.invalid)
+        self.stats["missing"] += len(report.missing)
@@ -0,0 +1,241 @@
+"""
+Колоночное хранилище товаров.
+
+Цены и остатки хранятся в массивах array (или просматриваются как
+массивы NumPy, если он установлен), названия и описания — в таблице
+интернированных строк. Объекты ProductRow — легкие представления
+строк хранилища, совместимые с Product.
+"""
+import operator
+from array import array
+
+from . import main
+from .main import Product
+
+try:
+    import numpy as np
+except ImportError:  # NumPy — необязательная зависимость
+    np = None
+
+
+class StringTable:
+    """Таблица интернированных строк: одинаковые строки хранятся один раз."""
+
+    __slots__ = ("_ids", "_strings")
+
+    def __init__(self):
+        self._ids = {}
+        self._strings = []
+
+    def intern(self, value):
+        """Возвращает номер строки в таблице, добавляя ее при необходимости."""
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._ids[value] = string_id
+            self._strings.append(value)
+        return string_id
+
+    def __getitem__(self, string_id):
+        return self._strings[string_id]
+
+    def __len__(self):
+        return len(self._strings)
+
+
+class ProductRow(Product):
+    """
+    Представление строки колоночного хранилища в виде Product.
+    Атрибуты читаются и записываются прямо в колонки, а сеттеры цены
+    и остатка Product работают без изменений через свойства
+    _Product__price и _Product__quantity.
+    """
+
+    __slots__ = ("_columns", "_index")
+
+    def __init__(self, columns, index):
+        self._columns = columns
+        self._index = index
+
+    @property
+    def name(self):
+        return self._columns.strings[self._columns.name_ids[self._index]]
+
+    @name.setter
+    def name(self, value):
+        self._columns.name_ids[self._index] = self._columns.strings.intern(value)
+
+    @property
+    def description(self):
+        return self._columns.strings[self._columns.description_ids[self._index]]
+
+    @description.setter
+    def description(self, value):
+        self._columns.description_ids[self._index] = self._columns.strings.intern(value)
+
+    @property
+    def _Product__quantity(self):
+        return self._columns.quantities[self._index]
+
+    @_Product__quantity.setter
+    def _Product__quantity(self, value):
+        self._columns.quantities[self._index] = value
+
+    @property
+    def _Product__price(self):
+        return self._columns.prices[self._index]
+
+    @_Product__price.setter
+    def _Product__price(self, value):
+        self._columns.prices[self._index] = value
+
+    @property
+    def _listeners(self):
+        return self._columns.listeners.setdefault(self._index, [])
+
+    def __reduce__(self):
+        # Строка копируется и сериализуется как ссылка на хранилище
+        return ProductRow, (self._columns, self._index)
+
+    def __eq__(self, other):
+        if not isinstance(other, ProductRow):
+            return NotImplemented
+        return self._columns is other._columns and self._index == other._index
+
+    def __hash__(self):
+        return hash((id(self._columns), self._index))
+
+    def __repr__(self):
+        return f"ProductRow({self.name!r}, {self.price}, {self.quantity})"
+
+
+class ProductColumns:
+    """
+    Колоночное хранилище товаров с векторными операциями:
+    стоимость остатков, маска диапазона цен, сортировка по цене
+    и массовое изменение остатков.
+    """
+
+    __slots__ = ("strings", "name_ids", "description_ids", "prices", "quantities",
+                 "listeners")
+
+    def __init__(self, products=()):
+        self.strings = StringTable()
+        self.name_ids = array("q")
+        self.description_ids = array("q")
+        self.prices = array("d")
+        self.quantities = array("q")
+        # Подписчики строк: номер строки -> список подписчиков
+        self.listeners = {}
+        self.extend(products)
+
+    def __getstate__(self):
+        # Подписчики строк не копируются и не сериализуются
+        return {name: getattr(self, name) for name in self.__slots__ if name != "listeners"}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.listeners = {}
+
+    def append(self, name, description, price, quantity):
+        """Добавляет строку и возвращает ее представление ProductRow."""
+        self.name_ids.append(self.strings.intern(name))
+        self.description_ids.append(self.strings.intern(description))
+        self.prices.append(price)
+        self.quantities.append(quantity)
+        return ProductRow(self, len(self.prices) - 1)
+
+    def add_product(self, product):
+        """Копирует объект Product в хранилище."""
+        if not isinstance(product, Product):
+            raise TypeError("Можно добавлять только объекты класса Product.")
+        return self.append(product.name, product.description, product.price,
+                           product.quantity)
+
+    def extend(self, products):
+        """Копирует в хранилище последовательность объектов Product."""
+        for product in products:
+            self.add_product(product)
+
+    def row(self, index):
+        """Возвращает представление строки с номером index."""
+        if not -len(self) <= index < len(self):
+            raise IndexError("Номер строки вне диапазона.")
+        return ProductRow(self, index % len(self))
+
+    def __len__(self):
+        return len(self.prices)
+
+    def __iter__(self):
+        return (ProductRow(self, index) for index in range(len(self)))
+
+    def total_value(self):
+        """Суммарная стоимость остатков: сумма цена × количество."""
+        if np is not None and len(self):
+            return float(np.dot(np.frombuffer(self.prices, dtype=np.float64),
+                                np.frombuffer(self.quantities, dtype=np.int64)))
+        return sum(map(operator.mul, self.prices, self.quantities))
+
+    def price_mask(self, low, high):
+        """Маска строк с ценой в диапазоне [low, high]."""
+        if np is not None:
+            prices = np.frombuffer(self.prices, dtype=np.float64)
+            return (prices >= low) & (prices <= high)
+        return [low <= price <= high for price in self.prices]
+
+    def price_range(self, low, high):
+        """Строки с ценой в диапазоне [low, high]."""
+        mask = self.price_mask(low, high)
+        return [ProductRow(self, index) for index, selected in enumerate(mask)
+                if selected]
+
+    def argsort_by_price(self, descending=False):
+        """Номера строк, упорядоченные по цене."""
+        if np is not None:
+            order = np.argsort(np.frombuffer(self.prices, dtype=np.float64),
+                               kind="stable")
+            return order[::-1].tolist() if descending else order.tolist()
+        return sorted(range(len(self)), key=self.prices.__getitem__,
+                      reverse=descending)
+
+    def sorted_by_price(self, descending=False):
+        """Строки, упорядоченные по цене."""
+        return [ProductRow(self, index) for index in self.argsort_by_price(descending)]
+
+    def adjust_quantities(self, delta, mask=None):
+        """
+        Массово изменяет остатки на delta. Если задана маска,
+        изменяются только отмеченные строки. Подписчики строк
+        оповещаются об изменении остатка, а подключенный журнал
+        (src/journal.py) получает запись о каждой измененной строке.
+        """
+        journal = main._journal
+        if journal is None:
+            watched = {index: self.quantities[index]
+                       for index, listeners in self.listeners.items() if listeners}
+        else:
+            watched = dict(enumerate(self.quantities))
+        self._adjust_quantities(delta, mask)
+        for index, old_quantity in watched.items():
+            new_quantity = self.quantities[index]
+            if new_quantity != old_quantity:
+                row = ProductRow(self, index)
+                if journal is not None:
+                    journal.quantity_changed(row, old_quantity, new_quantity)
+                row._notify("quantity", old_quantity, new_quantity)
+
+    def _adjust_quantities(self, delta, mask):
+        """Векторное изменение остатков без оповещения подписчиков."""
+        if np is not None and len(self):
+            quantities = np.frombuffer(self.quantities, dtype=np.int64)
+            if mask is None:
+                quantities += delta
+            else:
+                quantities[np.asarray(mask, dtype=bool)] += delta
+            return
+        if mask is None:
+            self.quantities = array("q", (quantity + delta for quantity in self.quantities))
+        else:
+            self.quantities = array("q", (quantity + delta if selected else quantity
+                                          for quantity, selected in zip(self.quantities, mask)))
@@ -0,0 +1,74 @@
+"""
+Потоковая выгрузка товаров категории в файл или HTTP-ответ.
+
+Товары читаются страницами, каждая страница форматируется
+и записывается одним вызовом write, поэтому пиковая память
+не зависит от размера категории.
+"""
+import csv
+import io
+import json
+from itertools import islice
+
+from .main import validate_page
+
+FORMATS = ("text", "csv", "jsonl")
+CSV_FIELDS = ("name", "description", "price", "quantity")
+
+
+def _product_pages(category, batch_size, after):
+    start = 0 if after is None else after + 1
+    products = islice(category, start, None)
+    while page := list(islice(products, batch_size)):
+        yield page
+
+
+def iter_export_chunks(category, fmt="text", batch_size=1000, after=None):
+    """
+    Генератор текстовых фрагментов выгрузки категории.
+    fmt: 'text' — строки как в Category.products, 'csv' — с заголовком,
+    'jsonl' — по объекту JSON на строку. after — курсор пропущенных товаров.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Неизвестный формат выгрузки: '{fmt}'.")
+    validate_page(batch_size, after)
+
+    if fmt == "text":
+        cursor = after
+        while True:
+            lines, cursor = category.products_page(batch_size, cursor)
+            if lines:
+                yield "\n".join(lines) + "\n"
+            if cursor is None:
+                return
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_FIELDS)
+        for page in _product_pages(category, batch_size, after):
+            writer.writerows((product.name, product.description, product.price,
+                              product.quantity) for product in page)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            # Категория пуста: выгружаем только заголовок
+            yield buffer.getvalue()
+        return
+
+    for page in _product_pages(category, batch_size, after):
+        yield "".join(json.dumps({"name": product.name, "description": product.description,
+                                  "price": product.price, "quantity": product.quantity},
+                                 ensure_ascii=False) + "\n" for product in page)
+
+
+def write_products(category, file, fmt="text", batch_size=1000, after=None):
+    """
+    Записывает товары категории в файловый объект file постранично.
+    Возвращает количество записанных символов.
+    """
+    written = 0
+    for chunk in iter_export_chunks(category, fmt, batch_size, after):
+        written += file.write(chunk)
+    return written
@@ -0,0 +1,114 @@
+"""
+Необязательные замеры горячих путей Product и Category.
+
+Пока сбор статистики выключен, каждая инструментированная операция
+стоит одну проверку на None. После enable() учитываются число вызовов,
+суммарное время и процентили Product.__init__, Product.set_price
+(включая сеттер price), Product.new_product и Category.add_product(s),
+а также события: найденные дубликаты и отклоненные цены.
+"""
+import random
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from time import perf_counter_ns
+
+from . import main
+
+# События отклоненных обновлений цены (см. Product.set_price)
+REJECTED_PRICE_EVENTS = ("price.rejected_invalid", "price.rejected_policy")
+
+
+class Profiler:
+    """
+    Сборщик статистики. Для процентилей хранит не более max_samples
+    замеров на операцию (равномерная выборка из всех вызовов).
+    """
+
+    def __init__(self, max_samples=10_000):
+        self.max_samples = max_samples
+        self.calls = Counter()
+        self.total_ns = Counter()
+        self.events = Counter()
+        self.samples = defaultdict(list)
+
+    def record(self, operation, started_ns):
+        """Учитывает вызов operation, начатый в момент started_ns."""
+        elapsed = perf_counter_ns() - started_ns
+        self.calls[operation] += 1
+        self.total_ns[operation] += elapsed
+        samples = self.samples[operation]
+        if len(samples) < self.max_samples:
+            samples.append(elapsed)
+        else:
+            index = random.randrange(self.calls[operation])
+            if index < self.max_samples:
+                samples[index] = elapsed
+
+    def count(self, event, amount=1):
+        """Учитывает событие event."""
+        self.events[event] += amount
+
+    def stats(self):
+        """Сводка по операциям и событиям в виде словаря."""
+        operations = {}
+        for operation, calls in self.calls.items():
+            samples = sorted(self.samples[operation])
+            operations[operation] = {
+                "calls": calls,
+                "total_ms": self.total_ns[operation] / 1e6,
+                "mean_us": self.total_ns[operation] / calls / 1e3,
+                "p50_us": percentile(samples, 0.50) / 1e3,
+                "p95_us": percentile(samples, 0.95) / 1e3,
+                "p99_us": percentile(samples, 0.99) / 1e3,
+            }
+        new_product_calls = self.calls["Product.new_product"]
+        return {
+            "operations": operations,
+            "events": dict(self.events),
+            "duplicate_hit_rate": (self.events["new_product.duplicate"] / new_product_calls
+                                   if new_product_calls else 0.0),
+            "rejected_price_updates": sum(self.events[event] for event in REJECTED_PRICE_EVENTS),
+        }
+
+
+def percentile(sorted_values, fraction):
+    """Процентиль по отсортированному списку (ближайший ранг)."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def enable(profiler=None):
+    """Включает сбор статистики и возвращает активный Profiler."""
+    if profiler is None:
+        profiler = Profiler()
+    main._profiler = profiler
+    return profiler
+
+
+def disable():
+    """Выключает сбор статистики и возвращает последний Profiler."""
+    profiler, main._profiler = main._profiler, None
+    return profiler
+
+
+def stats():
+    """Статистика активного Profiler или None, если сбор выключен."""
+    if main._profiler is None:
+        return None
+    return main._profiler.stats()
+
+
+@contextmanager
+def profile(max_samples=10_000):
+    """
+    Собирает статистику внутри блока with в новый Profiler;
+    после выхода восстанавливается прежнее состояние замеров.
+    """
+    previous = main._profiler
+    profiler = enable(Profiler(max_samples))
+    try:
+        yield profiler
+    finally:
+        main._profiler = previous
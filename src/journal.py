@@ -0,0 +1,309 @@
+"""
+Журнал изменений каталога только на дозапись.
+
+В журнал попадают создание товаров и категорий, добавление товаров
+в категории, слияние дубликатов через new_product, принятые
+и отклоненные цены и изменения остатков. Записи копятся в памяти
+и сбрасываются на диск пакетами (JSON Lines).
+
+Каталог журнала:
+    checkpoint.json          номер сегмента, с которого читать журнал
+    checkpoint-N.bin         снимок каталога (src/snapshot.py)
+    journal-N.log            сегменты журнала
+
+compact() сохраняет снимок всех известных журналу категорий и товаров
+и начинает новый сегмент, поэтому при восстановлении читается только
+хвост журнала после последнего снимка.
+"""
+import json
+import os
+import threading
+
+from . import main
+from .main import Category, Product
+from .repricing import ApprovePolicy
+from .snapshot import load_catalog, save_catalog
+
+CHECKPOINT_META = "checkpoint.json"
+
+
+def _detach_in_child():
+    # Дочерний процесс (например, воркер src/parallel.py) наследует
+    # подключенный журнал вместе с открытым сегментом; его записи
+    # перемешались бы с записями родителя и испортили журнал
+    main._journal = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_detach_in_child)
+
+
+def _segment_path(directory, segment):
+    return os.path.join(directory, f"journal-{segment:08d}.log")
+
+
+def _checkpoint_path(directory, segment):
+    return os.path.join(directory, f"checkpoint-{segment:08d}.bin")
+
+
+class Journal:
+    """
+    Журнал изменений в каталоге directory. При открытии существующего
+    каталога состояние восстанавливается: последний снимок плюс хвост
+    журнала; восстановленные объекты доступны в categories и products.
+
+    buffer_size — сколько записей копить до сброса на диск;
+    compact_every — после скольких записей сохранять новый снимок;
+    снимок сохраняет фоновый поток, а не изменяющая каталог операция;
+    fsync — вызывать os.fsync при каждом сбросе.
+    """
+
+    def __init__(self, directory, buffer_size=1024, compact_every=None, fsync=False):
+        self.directory = directory
+        self.buffer_size = buffer_size
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.products = []
+        self.categories = []
+        self._product_ids = {}
+        self._category_ids = {}
+        self._buffer = []
+        self._since_checkpoint = 0
+        self._compact_pending = False
+        self._closed = False
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._segment = self._recover()
+        self._file = open(_segment_path(directory, self._segment), "a", encoding="utf-8")
+        self._compact_requested = threading.Event()
+        self._compactor = None
+        if compact_every:
+            self._compactor = threading.Thread(target=self._run_compactor,
+                                               name="journal-compactor", daemon=True)
+            self._compactor.start()
+
+    # --- Восстановление ---
+
+    def _recover(self):
+        """Загружает снимок и воспроизводит журнал; возвращает номер нового сегмента."""
+        meta_path = os.path.join(self.directory, CHECKPOINT_META)
+        first_segment = 0
+        previous, main._journal = main._journal, None
+        try:
+            if os.path.exists(meta_path):
+                with open(meta_path, encoding="utf-8") as file:
+                    first_segment = json.load(file)["segment"]
+                with load_catalog(_checkpoint_path(self.directory, first_segment)) as snapshot:
+                    for product in snapshot.products:
+                        self._register_product(product)
+                    for category in snapshot.categories:
+                        self._register_category(category)
+            segments = sorted(int(name[8:16]) for name in os.listdir(self.directory)
+                              if name.startswith("journal-") and name.endswith(".log"))
+            segments = [segment for segment in segments if segment >= first_segment]
+            for segment in segments:
+                self._replay(_segment_path(self.directory, segment))
+        finally:
+            main._journal = previous
+        return max(segments, default=first_segment - 1) + 1
+
+    def _replay(self, path):
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Недописанная запись в конце сегмента после сбоя
+                    break
+                self._apply(entry)
+
+    def _apply(self, entry):
+        kind = entry[0]
+        if kind == "product":
+            self._register_product(Product(*entry[2:]))
+        elif kind == "category":
+            self._register_category(Category(entry[2], entry[3], []))
+        elif kind == "add":
+            category = self.categories[entry[1]]
+            # Пакет, уже попавший в снимок (снимок сохранялся, пока запись
+            # о добавлении ждала журнала), повторно не добавляется
+            if len(entry) < 4 or len(category) < entry[3] + len(entry[2]):
+                category.add_products(self.products[pid] for pid in entry[2])
+        elif kind == "price":
+            self.products[entry[1]].set_price(entry[3], ApprovePolicy())
+        elif kind == "quantity":
+            self.products[entry[1]].quantity = entry[3]
+        # 'merge' и 'price_rejected' не меняют состояние: последствия
+        # слияния записаны отдельными записями 'quantity' и 'price'
+
+    def _register_product(self, product):
+        product_id = self._product_ids[product] = len(self.products)
+        self.products.append(product)
+        return product_id
+
+    def _register_category(self, category):
+        category_id = self._category_ids[category] = len(self.categories)
+        self.categories.append(category)
+        return category_id
+
+    # --- Идентификаторы ---
+
+    def _product_id(self, product):
+        product_id = self._product_ids.get(product)
+        if product_id is None:
+            product_id = self._register_product(product)
+            self._write(("product", product_id, product.name, product.description,
+                         product.price, product.quantity))
+        return product_id
+
+    def _category_id(self, category):
+        category_id = self._category_ids.get(category)
+        if category_id is None:
+            category_id = self._register_category(category)
+            self._write(("category", category_id, category.name, category.description))
+        return category_id
+
+    def track(self, category):
+        """Начинает журналировать категорию, созданную до подключения журнала."""
+        with self._lock:
+            if category not in self._category_ids:
+                category_id = self._category_id(category)
+                self._write(("add", category_id,
+                             [self._product_id(product) for product in category], 0))
+
+    # --- Записи (вызываются из src/main.py) ---
+
+    def product_created(self, product):
+        with self._lock:
+            self._product_id(product)
+
+    def category_created(self, category):
+        with self._lock:
+            self._category_id(category)
+
+    def products_added(self, category, products, start):
+        with self._lock:
+            self._write(("add", self._category_id(category),
+                         [self._product_id(product) for product in products], start))
+
+    def product_merged(self, product, price, quantity):
+        with self._lock:
+            self._write(("merge", self._product_id(product), price, quantity))
+
+    def price_changed(self, product, old_price, new_price):
+        with self._lock:
+            self._write(("price", self._product_id(product), old_price, new_price))
+
+    def price_rejected(self, product, price, reason):
+        with self._lock:
+            self._write(("price_rejected", self._product_id(product), price, reason))
+
+    def quantity_changed(self, product, old_quantity, new_quantity):
+        with self._lock:
+            self._write(("quantity", self._product_id(product), old_quantity, new_quantity))
+
+    def _write(self, entry):
+        self._buffer.append(entry)
+        if len(self._buffer) >= self.buffer_size:
+            self._flush()
+
+    # --- Сброс, снимки, управление ---
+
+    def flush(self):
+        """Записывает накопленные записи на диск."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        entries, self._buffer = self._buffer, []
+        self._file.write("".join(json.dumps(entry, ensure_ascii=False, default=repr) + "\n"
+                                 for entry in entries))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._since_checkpoint += len(entries)
+        if self.compact_every and self._since_checkpoint >= self.compact_every:
+            # Сброс может произойти внутри изменения товара, поэтому
+            # снимок сохраняет фоновый поток (см. _run_compactor)
+            if not self._compact_pending:
+                self._compact_pending = True
+                self._compact_requested.set()
+
+    def compact(self):
+        """Сохраняет снимок каталога и начинает новый сегмент журнала."""
+        with self._lock:
+            self._flush()
+            self._compact()
+
+    def _run_compactor(self):
+        while True:
+            self._compact_requested.wait()
+            self._compact_requested.clear()
+            with self._lock:
+                if self._closed:
+                    return
+                if self._compact_pending:
+                    self._flush()
+                    self._compact()
+
+    def _compact(self):
+        # Товары категорий, добавленные до подключения журнала, тоже
+        # получают идентификаторы, чтобы порядок снимка совпадал с ними
+        for category in self.categories:
+            for product in category:
+                if product not in self._product_ids:
+                    self._register_product(product)
+        segment = self._segment + 1
+        checkpoint = _checkpoint_path(self.directory, segment)
+        save_catalog(checkpoint + ".tmp", self.categories, self.products)
+        os.replace(checkpoint + ".tmp", checkpoint)
+        meta_path = os.path.join(self.directory, CHECKPOINT_META)
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump({"segment": segment}, file)
+        os.replace(meta_path + ".tmp", meta_path)
+
+        self._file.close()
+        self._segment = segment
+        self._file = open(_segment_path(self.directory, segment), "a", encoding="utf-8")
+        self._since_checkpoint = 0
+        self._compact_pending = False
+        for name in os.listdir(self.directory):
+            if name.startswith(("journal-", "checkpoint-")) and name[-4:] in (".log", ".bin"):
+                if int(name.split("-")[1][:8]) < segment:
+                    os.remove(os.path.join(self.directory, name))
+
+    def attach(self):
+        """
+        Подключает журнал к Product и Category текущего процесса;
+        дочерние процессы, созданные через fork, его не наследуют.
+        """
+        main._journal = self
+        return self
+
+    def detach(self):
+        """Отключает журнал, если он подключен."""
+        if main._journal is self:
+            main._journal = None
+
+    def close(self):
+        """Отключает журнал, сбрасывает записи и закрывает сегмент."""
+        self.detach()
+        with self._lock:
+            if self._closed:
+                return
+            self._flush()
+            if self._compact_pending:
+                self._compact()
+            self._file.close()
+            self._closed = True
+        if self._compactor is not None:
+            self._compact_requested.set()
+            self._compactor.join()
+
+    def __enter__(self):
+        return self.attach()
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,131 @@
+"""
+Потоковая загрузка товаров из файлов CSV и JSON Lines.
+
+Файлы читаются построчно через генераторы и целиком в память
+не загружаются. Записи проверяются пакетами, дубликаты сливаются
+по правилам Product.new_product.
+"""
+import csv
+import json
+import os
+from contextlib import contextmanager
+from itertools import islice
+
+from .main import Product, ProductRegistry
+
+REQUIRED_FIELDS = ("name", "description", "price", "quantity")
+
+
+@contextmanager
+def _open_source(source, **kwargs):
+    """Открывает путь к файлу или возвращает уже открытый файловый объект."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8", **kwargs) as file:
+            yield file
+    else:
+        yield source
+
+
+def iter_csv_records(source, delimiter=","):
+    """Построчно читает записи о товарах из CSV-файла с заголовком."""
+    with _open_source(source, newline="") as file:
+        yield from csv.DictReader(file, delimiter=delimiter)
+
+
+def iter_jsonl_records(source):
+    """Построчно читает записи о товарах из файла JSON Lines."""
+    with _open_source(source) as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def iter_records(source, fmt=None):
+    """
+    Читает записи из файла в формате fmt ('csv' или 'jsonl').
+    Если формат не указан, он определяется по расширению файла.
+    """
+    if fmt is None:
+        path = getattr(source, "name", source)
+        fmt = os.path.splitext(os.fspath(path))[1].lstrip(".").lower()
+    if fmt == "csv":
+        return iter_csv_records(source)
+    if fmt in ("jsonl", "ndjson"):
+        return iter_jsonl_records(source)
+    raise ValueError(f"Неизвестный формат файла: '{fmt}'.")
+
+
+def batched(iterable, size):
+    """Разбивает итерируемый объект на списки длиной не больше size."""
+    if size < 1:
+        raise ValueError("Размер пакета должен быть положительным.")
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def normalize_record(record):
+    """
+    Приводит запись к виду, который ожидает Product.new_product:
+    цена — float больше 0, количество — неотрицательный int.
+    Строки из CSV преобразуются.
+    """
+    if any(record.get(field) in (None, "") for field in REQUIRED_FIELDS):
+        raise ValueError("Недостаточно данных для создания продукта.")
+    try:
+        price = float(record["price"])
+        quantity = int(record["quantity"])
+    except (TypeError, ValueError):
+        raise ValueError(f"Некорректная цена или количество товара "
+                         f"'{record['name']}'.") from None
+    if not price > 0:
+        raise ValueError(f"Цена товара '{record['name']}' должна быть больше 0.")
+    if quantity < 0:
+        raise ValueError(f"Количество товара '{record['name']}' не может быть отрицательным.")
+    return {"name": record["name"], "description": record["description"],
+            "price": price, "quantity": quantity}
+
+
+def validate_batch(records, skip_invalid=False):
+    """
+    Проверяет пакет записей. При skip_invalid=True некорректные
+    записи пропускаются, иначе первая ошибка выбрасывает ValueError.
+    """
+    valid = []
+    for record in records:
+        try:
+            valid.append(normalize_record(record))
+        except ValueError:
+            if not skip_invalid:
+                raise
+    return valid
+
+
+def iter_products(source, fmt=None, registry=None, batch_size=1000,
+                  skip_invalid=False):
+    """
+    Генератор новых объектов Product из файла. Дубликаты по имени
+    сливаются с ранее выданными товарами через реестр registry
+    и повторно не выдаются.
+    """
+    if registry is None:
+        registry = ProductRegistry()
+    for batch in batched(iter_records(source, fmt), batch_size):
+        for product_data in validate_batch(batch, skip_invalid):
+            existing_product = registry.get(product_data["name"])
+            product = Product.new_product(product_data, registry)
+            if product is not existing_product:
+                yield product
+
+
+def load_into_category(category, source, fmt=None, batch_size=1000,
+                       skip_invalid=False):
+    """
+    Загружает записи из файла в категорию пакетами через
+    Category.merge_products. Возвращает количество новых товаров.
+    """
+    added = 0
+    for batch in batched(iter_records(source, fmt), batch_size):
+        added += len(category.merge_products(validate_batch(batch, skip_invalid)))
+    return added
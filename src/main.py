@@ -1,11 +1,193 @@
+import logging
+import math
+import threading
+import types
+import weakref
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from operator import itemgetter
+from time import perf_counter_ns
+
+# Сообщения о дубликатах и отклоненных ценах; отключаются настройкой логгера
+logger = logging.getLogger(__name__)
+
+# Сборщик статистики горячих путей (см. src/instrumentation.py).
+# Пока он не включен, измерения стоят одну проверку на None.
+_profiler = None
+
+# Журнал изменений каталога (см. src/journal.py); None — журнал выключен.
+_journal = None
+
+
+def _listener_ref(listener):
+    """
+    Ссылка на подписчика товара. Связанные методы хранятся по слабой
+    ссылке, чтобы подписка не удерживала в памяти их объект (например,
+    категорию, пока живут ее товары).
+    """
+    if isinstance(listener, types.MethodType):
+        return weakref.WeakMethod(listener)
+    return lambda: listener
+
+
+def normalize_name(name):
+    """
+    Нормализованный ключ для поиска дубликатов:
+    без учета регистра и лишних пробелов.
+    """
+    return " ".join(str(name).split()).casefold()
+
+
+def validate_page(limit, after):
+    """
+    Проверяет параметры страницы: limit — целое >= 1, after — None
+    или целый курсор >= -1. Иначе выгрузка по курсору не продвигалась бы.
+    """
+    if isinstance(limit, bool) or not isinstance(limit, int) or limit < 1:
+        raise ValueError("Размер страницы должен быть положительным.")
+    if after is not None and (isinstance(after, bool) or not isinstance(after, int) or after < -1):
+        raise ValueError("Курсор страницы должен быть целым числом не меньше -1.")
+
+
+class ProductRegistry:
+    """
+    Реестр товаров с поиском дубликатов по ключу за O(1).
+    По умолчанию ключом служит имя товара, key_func позволяет
+    задать нормализованный ключ (например, normalize_name).
+    """
+
+    def __init__(self, products=(), key_func=None):
+        self.key_func = key_func
+        self.__index = {}
+        for product in products:
+            self.add(product)
+
+    def key(self, name):
+        """Возвращает ключ реестра для имени товара."""
+        if self.key_func is None:
+            return name
+        return self.key_func(name)
+
+    def get(self, name, default=None):
+        """Возвращает товар с таким же ключом имени или default."""
+        return self.__index.get(self.key(name), default)
+
+    def add(self, product):
+        """
+        Регистрирует товар. Если товар с таким ключом уже есть,
+        реестр не меняется и возвращается False.
+        """
+        key = self.key(product.name)
+        if key in self.__index:
+            return False
+        self.__index[key] = product
+        return True
+
+    def __contains__(self, name):
+        return self.key(name) in self.__index
+
+    def __len__(self):
+        return len(self.__index)
+
+    def __iter__(self):
+        return iter(self.__index.values())
+
+
+class InteractivePricePolicy:
+    """Политика понижения цены: подтверждение пользователем в терминале."""
+
+    def approve(self, product, old_price, new_price):
+        """Запрашивает подтверждение (y/n) и возвращает решение."""
+        while True:
+            confirmation = input(
+                f"Цена товара '{product.name}' понижается с {old_price} до "
+                f"{new_price}. Подтвердите (y/n): ").lower()
+            if confirmation == 'y':
+                logger.info("Цена товара '%s' успешно понижена до %s.",
+                            product.name, new_price)
+                return True
+            elif confirmation == 'n':
+                logger.info("Понижение цены для '%s' отменено. Текущая цена: %s.",
+                            product.name, old_price)
+                return False
+            else:
+                print("Некорректный ввод. Пожалуйста, введите 'y' или 'n'.")
+
+
 class Product:
+    # Политика согласования понижения цены в сеттере price
+    price_policy = InteractivePricePolicy()
 
     def __init__(self, name, description, price, quantity):
+        profiler = _profiler
+        if profiler is not None:
+            started = perf_counter_ns()
+        # Подписчики на изменение цены и остатка (см. add_listener)
+        self._listeners = []
         self.name = name
         self.description = description
         # Приватный атрибут для цены
         self.__price = price
-        self.quantity = quantity
+        self.__quantity = quantity
+        if _journal is not None:
+            _journal.product_created(self)
+        if profiler is not None:
+            profiler.record("Product.__init__", started)
+
+    def add_listener(self, listener):
+        """
+        Подписывает listener на изменения цены и остатка товара.
+        Он вызывается как listener(product, field, old_value, new_value),
+        где field — 'price' или 'quantity'.
+        """
+        self._listeners.append(_listener_ref(listener))
+
+    def remove_listener(self, listener):
+        """Отписывает listener от изменений товара."""
+        listeners = self._listeners
+        for position, ref in enumerate(listeners):
+            if ref() == listener:
+                del listeners[position]
+                return
+        raise ValueError("Подписчик не найден.")
+
+    def _notify(self, field, old_value, new_value):
+        """Оповещает подписчиков об изменении поля товара."""
+        dead = False
+        for ref in self._listeners:
+            listener = ref()
+            if listener is None:
+                dead = True
+            else:
+                listener(self, field, old_value, new_value)
+        if dead:
+            # Подписчик собран сборщиком мусора — убираем его ссылку
+            self._listeners[:] = [ref for ref in self._listeners if ref() is not None]
+
+    def __getstate__(self):
+        # Подписки не копируются и не сериализуются: копия товара
+        # начинает жизнь без подписчиков
+        state = self.__dict__.copy()
+        state.pop("_listeners", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._listeners = []
+
+    @property
+    def quantity(self):
+        """Геттер для получения остатка продукта."""
+        return self.__quantity
+
+    @quantity.setter
+    def quantity(self, new_quantity):
+        """Сеттер остатка: оповещает подписчиков об изменении."""
+        old_quantity = self.__quantity
+        self.__quantity = new_quantity
+        if _journal is not None:
+            _journal.quantity_changed(self, old_quantity, new_quantity)
+        self._notify("quantity", old_quantity, new_quantity)
 
     @property
     def price(self):
@@ -17,43 +199,87 @@ class Product:
         """
         Сеттер для установки цены продукта с проверками.
         Цена не должна быть <= 0.
-        При понижении цены требуется подтверждение пользователя.
+        Понижение цены согласуется с политикой Product.price_policy,
+        по умолчанию — подтверждением пользователя.
+        """
+        self.set_price(new_price)
+
+    def set_price(self, new_price, policy=None):
+        """
+        Устанавливает цену с проверками сеттера price.
+        Понижение цены согласуется с политикой policy
+        (если не указана — Product.price_policy).
+        Возвращает True, если цена изменена.
+        """
+        profiler = _profiler
+        if profiler is None:
+            return self.__set_price(new_price, policy, None)
+        started = perf_counter_ns()
+        changed = self.__set_price(new_price, policy, profiler)
+        profiler.record("Product.set_price", started)
+        return changed
+
+    def __set_price(self, new_price, policy, profiler):
+        """
+        Проверки и согласование цены; отказы учитываются
+        в profiler и записываются в журнал изменений.
         """
+        reason = self.__check_price(new_price, policy)
+        if reason is not None:
+            if profiler is not None:
+                profiler.count(f"price.rejected_{reason}")
+            if _journal is not None:
+                _journal.price_rejected(self, new_price, reason)
+            return False
+        self.__update_price(new_price)
+        return True
+
+    def __check_price(self, new_price, policy):
+        """Возвращает причину отказа ('invalid' или 'policy') либо None."""
         if not isinstance(new_price, (int, float)):
-            print("Цена должна быть числом.")
-            return
+            logger.warning("Цена должна быть числом.")
+            return "invalid"
 
         if new_price <= 0:
-            print("Цена не должна быть нулевая или отрицательная")
-            return
+            logger.warning("Цена не должна быть нулевая или отрицательная")
+            return "invalid"
 
         # Дополнительное задание 4: Логика подтверждения понижения цены
         if new_price < self.__price:
-            while True:
-                confirmation = input(
-                    f"Цена товара '{self.name}' понижается с {self.__price} до "
-                    f"{new_price}. Подтвердите (y/n): ").lower()
-                if confirmation == 'y':
-                    self.__price = new_price
-                    print(f"Цена товара '{self.name}' успешно понижена до "
-                          f"{self.__price}.")
-                    break
-                elif confirmation == 'n':
-                    print(f"Понижение цены для '{self.name}' отменено. "
-                          f"Текущая цена: {self.__price}.")
-                    break
-                else:
-                    print("Некорректный ввод. Пожалуйста, введите 'y' или 'n'.")
-        else:
-            self.__price = new_price
+            if policy is None:
+                policy = self.price_policy
+            if not policy.approve(self, self.__price, new_price):
+                return "policy"
+        return None
+
+    def __update_price(self, new_price):
+        """Записывает принятую цену и оповещает подписчиков."""
+        old_price = self.__price
+        self.__price = new_price
+        if _journal is not None:
+            _journal.price_changed(self, old_price, new_price)
+        self._notify("price", old_price, new_price)
 
     @classmethod
     def new_product(cls, product_data, products_list=None):
         """
         Создает новый объект Product из словаря данных.
         Если products_list предоставлен, проверяет на дубликаты по имени.
+        Вместо списка можно передать ProductRegistry: тогда поиск
+        дубликата выполняется за O(1), а новый товар регистрируется в нем.
         При дубликате складывает количество и выбирает более высокую цену.
         """
+        profiler = _profiler
+        if profiler is None:
+            return cls._create_or_merge(product_data, products_list)
+        started = perf_counter_ns()
+        product = cls._create_or_merge(product_data, products_list)
+        profiler.record("Product.new_product", started)
+        return product
+
+    @classmethod
+    def _create_or_merge(cls, product_data, products_list):
+        """Реализация new_product без замеров."""
         name = product_data.get("name")
         description = product_data.get("description")
         price = product_data.get("price")
@@ -62,60 +288,647 @@ class Product:
         if not all([name, description, price, quantity is not None]):
             raise ValueError("Недостаточно данных для создания продукта.")
 
+        if isinstance(products_list, ProductRegistry):
+            existing_product = products_list.get(name)
+            if existing_product is not None:
+                return cls._merge_duplicate(existing_product, price, quantity)
+            # Новый товар сразу регистрируем, чтобы следующие записи
+            # с тем же именем нашлись как дубликаты
+            product = cls(name, description, price, quantity)
+            products_list.add(product)
+            return product
+
         if products_list:
             for existing_product in products_list:
                 if existing_product.name == name:
-                    print(f"Найден дубликат товара: '{name}'. "
-                          f"Обновляем существующий товар.")
-                    existing_product.quantity += quantity
-                    if price > existing_product.price:
-                        # Используем сеттер для проверки цены
-                        existing_product.price = price
-                    # Возвращаем обновленный существующий продукт
-                    return existing_product
+                    return cls._merge_duplicate(existing_product, price, quantity)
 
         # Если дубликат не найден или список не предоставлен, создаем новый продукт
         return cls(name, description, price, quantity)
 
+    @staticmethod
+    def _merge_duplicate(existing_product, price, quantity):
+        """Складывает количество и выбирает более высокую цену."""
+        logger.info("Найден дубликат товара: '%s'. Обновляем существующий товар.",
+                    existing_product.name)
+        if _profiler is not None:
+            _profiler.count("new_product.duplicate")
+        if _journal is not None:
+            _journal.product_merged(existing_product, price, quantity)
+        existing_product.quantity += quantity
+        if price > existing_product.price:
+            # Используем сеттер для проверки цены
+            existing_product.price = price
+        # Возвращаем обновленный существующий продукт
+        return existing_product
+
+
+class ProductLines(Sequence):
+    """
+    Представление строк товаров категории только для чтения.
+    Перед чтением перерисовываются лишь строки измененных товаров.
+    """
+
+    __slots__ = ("_lines", "_refresh")
+
+    def __init__(self, lines, refresh):
+        self._lines = lines
+        self._refresh = refresh
+
+    def __getitem__(self, index):
+        self._refresh()
+        return self._lines[index]
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __iter__(self):
+        self._refresh()
+        return iter(self._lines)
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class PriceIndex:
+    """
+    Отсортированный по цене индекс товаров: список отсортированных
+    блоков ограниченного размера с поиском через bisect. Вставка и
+    удаление сдвигают только один блок, а не весь индекс.
+    Ключ записи — (цена, позиция), позиция различает записи
+    с одинаковой ценой и позволяет удалить запись при смене цены.
+    """
+
+    # Размер блока; блок вдвое больше делится пополам
+    BLOCK_SIZE = 512
+
+    def __init__(self):
+        self.__blocks = []
+        self.__products = []
+        self.__maxes = []
+        self.__size = 0
+
+    def add(self, price, position, product):
+        """Добавляет запись товара на позиции position с ценой price."""
+        key = (price, position)
+        self.__size += 1
+        if not self.__blocks:
+            self.__blocks.append([key])
+            self.__products.append([product])
+            self.__maxes.append(key)
+            return
+        block_index = min(bisect_left(self.__maxes, key), len(self.__maxes) - 1)
+        block = self.__blocks[block_index]
+        index = bisect_right(block, key)
+        block.insert(index, key)
+        self.__products[block_index].insert(index, product)
+        self.__maxes[block_index] = block[-1]
+        if len(block) > 2 * self.BLOCK_SIZE:
+            self.__split(block_index)
+
+    def __split(self, block_index):
+        """Делит переполненный блок пополам."""
+        block = self.__blocks[block_index]
+        products = self.__products[block_index]
+        half = len(block) // 2
+        self.__blocks[block_index:block_index + 1] = [block[:half], block[half:]]
+        self.__products[block_index:block_index + 1] = [products[:half], products[half:]]
+        self.__maxes[block_index:block_index + 1] = [block[half - 1], block[-1]]
+
+    def extend(self, entries):
+        """
+        Добавляет записи (цена, позиция, товар) пакетом: пакет, сравнимый
+        по размеру с индексом, сливается с ним одной сортировкой, а не
+        вставкой каждой записи. Небольшие пакеты вставляются поштучно,
+        чтобы не пересобирать большой индекс на каждый пакет.
+        """
+        entries = list(entries)
+        if len(entries) <= max(self.BLOCK_SIZE, self.__size // 8):
+            for price, position, product in entries:
+                self.add(price, position, product)
+            return
+        merged = [(key, product) for block, products in zip(self.__blocks, self.__products)
+                  for key, product in zip(block, products)]
+        merged.extend(((price, position), product) for price, position, product in entries)
+        merged.sort(key=itemgetter(0))
+        size = self.BLOCK_SIZE
+        self.__blocks = [[key for key, _ in merged[i:i + size]] for i in range(0, len(merged), size)]
+        self.__products = [[product for _, product in merged[i:i + size]]
+                           for i in range(0, len(merged), size)]
+        self.__maxes = [block[-1] for block in self.__blocks]
+        self.__size = len(merged)
+
+    def remove(self, price, position):
+        """Удаляет запись товара на позиции position с ценой price."""
+        key = (price, position)
+        block_index = bisect_left(self.__maxes, key)
+        if block_index == len(self.__blocks):
+            raise ValueError(f"Записи {key} нет в индексе цен.")
+        block = self.__blocks[block_index]
+        index = bisect_left(block, key)
+        if block[index] != key:
+            raise ValueError(f"Записи {key} нет в индексе цен.")
+        del block[index]
+        del self.__products[block_index][index]
+        self.__size -= 1
+        if block:
+            self.__maxes[block_index] = block[-1]
+        else:
+            del self.__blocks[block_index]
+            del self.__products[block_index]
+            del self.__maxes[block_index]
+
+    def range(self, low, high):
+        """Товары с ценой в диапазоне [low, high] по возрастанию цены."""
+        result = []
+        block_index = bisect_left(self.__maxes, (low,))
+        blocks = zip(self.__blocks[block_index:], self.__products[block_index:])
+        for offset, (block, products) in enumerate(blocks):
+            start = bisect_left(block, (low,)) if offset == 0 else 0
+            stop = bisect_right(block, (high, math.inf))
+            result.extend(products[start:stop])
+            if stop < len(block):
+                break
+        return result
+
+    def first(self, count):
+        """count самых дешевых товаров по возрастанию цены."""
+        result = []
+        for products in self.__products:
+            if len(result) >= count:
+                break
+            result.extend(products[:count - len(result)])
+        return result
+
+    def last(self, count):
+        """count самых дорогих товаров по убыванию цены."""
+        result = []
+        for products in reversed(self.__products):
+            if len(result) >= count:
+                break
+            result.extend(reversed(products[-(count - len(result)):]))
+        return result
+
+    def __len__(self):
+        return self.__size
+
+
+class ShardedCounter:
+    """
+    Потокобезопасный счетчик: каждый поток увеличивает свою ячейку
+    без блокировок, значение счетчика — сумма всех ячеек. Ячейка
+    завершившегося потока переносится в базовое значение, поэтому
+    число ячеек не растет вместе с числом созданных потоков.
+    """
+
+    def __init__(self, value=0):
+        self.__base = value
+        self.__cells = []
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+
+    def add(self, amount=1):
+        """Увеличивает счетчик на amount в ячейке текущего потока."""
+        try:
+            cell = self.__local.cell
+        except AttributeError:
+            cell = self.__new_cell()
+        cell[0] += amount
+
+    def __new_cell(self):
+        cell = [0]
+        # Владелец ячейки живет в данных потока и удаляется вместе с ними
+        # при завершении потока; тогда ячейка переносится в __base
+        owner = self.__local.owner = _CellOwner()
+        weakref.finalize(owner, self.__retire, cell)
+        with self.__lock:
+            self.__cells.append(cell)
+        self.__local.cell = cell
+        return cell
+
+    def __retire(self, cell):
+        with self.__lock:
+            # Ячейки сравниваются по значению, поэтому ищем по идентичности
+            for index, existing in enumerate(self.__cells):
+                if existing is cell:
+                    del self.__cells[index]
+                    break
+            self.__base += cell[0]
+
+    @property
+    def value(self):
+        """Текущее значение счетчика."""
+        with self.__lock:
+            return self.__base + sum(cell[0] for cell in self.__cells)
+
+    @property
+    def shard_count(self):
+        """Число ячеек живых потоков."""
+        return len(self.__cells)
+
+    def reset(self, value=0):
+        """
+        Устанавливает значение счетчика. Не предназначен для вызова
+        одновременно с add из других потоков.
+        """
+        with self.__lock:
+            for cell in self.__cells:
+                cell[0] = 0
+            self.__base = value
+
+
+class _CellOwner:
+    """Метка потока, по удалению которой ShardedCounter забирает его ячейку."""
+
+    __slots__ = ("__weakref__",)
+
+
+class _CategoryMeta(type):
+    """
+    Метакласс Category: счетчики category_count и product_count
+    читаются и присваиваются как атрибуты класса, но хранятся
+    в потокобезопасных ShardedCounter.
+    """
+
+    @property
+    def category_count(cls):
+        return cls._category_counter.value
+
+    @category_count.setter
+    def category_count(cls, value):
+        cls._category_counter.reset(value)
+
+    @property
+    def product_count(cls):
+        return cls._product_counter.value
+
+    @product_count.setter
+    def product_count(cls, value):
+        cls._product_counter.reset(value)
+
 
-class Category:
-    category_count = 0
-    product_count = 0
+class Category(metaclass=_CategoryMeta):
+    _category_counter = ShardedCounter()
+    _product_counter = ShardedCounter()
+    # Общая для всех категорий блокировка слияния. Товар может входить
+    # в несколько категорий, и его изменение берет блокировки каждой из
+    # них; поэтому товары меняются под этой блокировкой, но не под
+    # блокировкой категории — порядок захвата всегда один.
+    _merge_lock = threading.RLock()
 
     def __init__(self, name, description, products):
         self.name = name
         self.description = description
         # Задание 1: Приватный список товаров
         self.__products = []
-        # Добавляем продукты через метод add_product,
+        # Индекс товаров категории по имени для поиска дубликатов
+        self.__registry = ProductRegistry()
+        # Кэш строк товаров: перерисовываются только строки из __dirty
+        self.__lines = []
+        self.__positions = {}
+        # Цена и остаток товара, по которым он сейчас учтен в индексах
+        # и агрегатах. Оповещения из разных потоков могут прийти не по
+        # порядку, поэтому индексы сверяются с этими значениями, а не
+        # со значениями из оповещения
+        self.__indexed = {}
+        self.__dirty = set()
+        self.__lines_view = ProductLines(self.__lines, self.__refresh_lines)
+        # Индексы по цене: всех товаров и товаров в наличии
+        self.__price_index = PriceIndex()
+        self.__in_stock_index = PriceIndex()
+        # Агрегаты категории, обновляемые при каждом изменении
+        self.__total_quantity = 0
+        self.__inventory_value = 0
+        self.__price_sum = 0
+        # Блокировка для добавления и слияния товаров из нескольких потоков
+        self.__lock = threading.RLock()
+        # Подписчики на добавление товаров (см. add_listener)
+        self.__listeners = []
+        if _journal is not None:
+            _journal.category_created(self)
+        # Добавляем продукты через метод add_products,
         # чтобы использовать его логику и увеличивать счетчик
-        for product in products:
-            self.add_product(product)
+        self.add_products(products)
+
+        Category._category_counter.add()
+
+    @property
+    def category_count(self):
+        """Общее количество категорий (Category.category_count)."""
+        return type(self).category_count
+
+    @property
+    def product_count(self):
+        """Общее количество товаров в категориях (Category.product_count)."""
+        return type(self).product_count
+
+    @classmethod
+    def snapshot_counts(cls):
+        """Возвращает текущие значения счетчиков категорий и товаров."""
+        return {"category_count": cls.category_count,
+                "product_count": cls.product_count}
+
+    @classmethod
+    def restore_counts(cls, snapshot):
+        """Восстанавливает счетчики из snapshot_counts."""
+        cls.category_count = snapshot["category_count"]
+        cls.product_count = snapshot["product_count"]
 
-        Category.category_count += 1
+    @classmethod
+    def reset_counts(cls):
+        """Обнуляет счетчики категорий и товаров."""
+        cls.restore_counts({"category_count": 0, "product_count": 0})
 
     def add_product(self, product):
         """Добавляет объект Product в список товаров категории."""
+        profiler = _profiler
+        if profiler is not None:
+            started = perf_counter_ns()
         if not isinstance(product, Product):
             raise TypeError("Можно добавлять только объекты класса Product.")
-        self.__products.append(product)
-        Category.product_count += 1  # Увеличиваем общий счетчик товаров
+        with self.__lock:
+            self.__products.append(product)
+            start = len(self.__products) - 1
+            self.__index_products([product], start)
+        Category._product_counter.add()  # Увеличиваем общий счетчик товаров
+        if _journal is not None:
+            _journal.products_added(self, [product], start)
+        self.__notify_added([product])
+        if profiler is not None:
+            profiler.record("Category.add_product", started)
+
+    def add_products(self, products):
+        """
+        Добавляет пакет объектов Product за один проход:
+        пакет проверяется целиком до изменения категории,
+        список и счетчик товаров обновляются один раз.
+        Возвращает количество добавленных товаров.
+        """
+        profiler = _profiler
+        if profiler is not None:
+            started = perf_counter_ns()
+        batch = list(products)
+        if not all(isinstance(product, Product) for product in batch):
+            raise TypeError("Можно добавлять только объекты класса Product.")
+        with self.__lock:
+            start = len(self.__products)
+            self.__products.extend(batch)
+            self.__index_products(batch, start)
+        Category._product_counter.add(len(batch))
+        if batch:
+            if _journal is not None:
+                _journal.products_added(self, batch, start)
+            self.__notify_added(batch)
+        if profiler is not None:
+            profiler.record("Category.add_products", started)
+        return len(batch)
+
+    def add_listener(self, listener):
+        """
+        Подписывает listener на добавление товаров в категорию.
+        Он вызывается как listener(category, products) со списком
+        добавленных товаров.
+        """
+        self.__listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Отписывает listener от добавления товаров."""
+        self.__listeners.remove(listener)
+
+    def __notify_added(self, products):
+        for listener in self.__listeners:
+            listener(self, products)
+
+    def __index_products(self, batch, start):
+        """Обновляет индексы категории для товаров, добавленных с позиции start."""
+        entries = []
+        for position, product in enumerate(batch, start):
+            self.__registry.add(product)
+            self.__lines.append(self.__render(product))
+            positions = self.__positions.get(product)
+            if positions is None:
+                # Подписываемся на изменения товара один раз,
+                # даже если он добавлен в категорию несколько раз
+                self.__positions[product] = [position]
+                self.__indexed[product] = (product.price, product.quantity)
+                product.add_listener(self.__on_product_changed)
+            else:
+                positions.append(position)
+            price, quantity = self.__indexed[product]
+            self.__total_quantity += quantity
+            self.__inventory_value += price * quantity
+            self.__price_sum += price
+            entries.append((price, position, product))
+        self.__price_index.extend(entries)
+        self.__in_stock_index.extend(entry for entry in entries
+                                     if self.__indexed[entry[2]][1] > 0)
+
+    def __on_product_changed(self, product, field, old_value, new_value):
+        """
+        Помечает строки измененного товара для перерисовки,
+        обновляет индексы по цене и агрегаты категории. Текущие цена
+        и остаток читаются под блокировкой категории, а старые берутся
+        из __indexed, поэтому порядок оповещений не важен.
+        """
+        with self.__lock:
+            old_price, old_quantity = self.__indexed[product]
+            price, quantity = product.price, product.quantity
+            if price == old_price and quantity == old_quantity:
+                return
+            self.__indexed[product] = (price, quantity)
+            positions = self.__positions[product]
+            self.__dirty.update(positions)
+            count = len(positions)
+            self.__price_sum += (price - old_price) * count
+            self.__total_quantity += (quantity - old_quantity) * count
+            self.__inventory_value += (price * quantity - old_price * old_quantity) * count
+            was_in_stock, in_stock = old_quantity > 0, quantity > 0
+            price_changed = price != old_price
+            for position in positions:
+                if price_changed:
+                    self.__price_index.remove(old_price, position)
+                    self.__price_index.add(price, position, product)
+                if was_in_stock and (price_changed or not in_stock):
+                    self.__in_stock_index.remove(old_price, position)
+                if in_stock and (price_changed or not was_in_stock):
+                    self.__in_stock_index.add(price, position, product)
+
+    def __refresh_lines(self):
+        """Перерисовывает строки товаров, измененных после прошлого чтения."""
+        if not self.__dirty:
+            return
+        with self.__lock:
+            while self.__dirty:
+                position = self.__dirty.pop()
+                self.__lines[position] = self.__render(self.__products[position])
+
+    @staticmethod
+    def __render(product):
+        """Строка товара: 'Название продукта, Цена руб. Остаток: N шт.'"""
+        return (f"{product.name}, {product.price} руб. "
+                f"Остаток: {product.quantity} шт.")
+
+    def __len__(self):
+        """Количество товаров в категории."""
+        return len(self.__products)
+
+    def __iter__(self):
+        """Итерация по объектам Product категории в порядке добавления."""
+        return iter(self.__products)
+
+    def find_product(self, name):
+        """Возвращает товар категории с указанным именем или None за O(1)."""
+        return self.__registry.get(name)
+
+    def merge_product(self, product_data):
+        """
+        Добавляет товар из словаря данных по правилам new_product:
+        дубликат по имени обновляет существующий товар категории,
+        новый товар добавляется в категорию.
+        Безопасно вызывать из нескольких потоков.
+        """
+        with Category._merge_lock:
+            existing_product = self.__registry.get(product_data.get("name"))
+            product = Product.new_product(product_data, self.__registry)
+            if product is not existing_product:
+                self.add_product(product)
+        return product
+
+    def merge_products(self, records):
+        """
+        Пакетный вариант merge_product: дубликаты (в том числе внутри
+        пакета) обновляют существующие товары, новые товары добавляются
+        в категорию одним вызовом add_products.
+        Безопасно вызывать из нескольких потоков.
+        Возвращает список новых товаров.
+        """
+        new_products = []
+        with Category._merge_lock:
+            try:
+                for product_data in records:
+                    existing_product = self.__registry.get(product_data.get("name"))
+                    product = Product.new_product(product_data, self.__registry)
+                    if product is not existing_product:
+                        new_products.append(product)
+            finally:
+                # Уже зарегистрированные товары добавляем и при ошибке в пакете,
+                # чтобы индекс и список товаров категории не расходились
+                self.add_products(new_products)
+        return new_products
+
+    def range_by_price(self, low, high, in_stock=False):
+        """
+        Товары с ценой в диапазоне [low, high] по возрастанию цены.
+        При in_stock=True — только товары с положительным остатком.
+        """
+        with self.__lock:
+            return self.__select_price_index(in_stock).range(low, high)
+
+    def cheapest(self, count, in_stock=False):
+        """count самых дешевых товаров по возрастанию цены."""
+        with self.__lock:
+            return self.__select_price_index(in_stock).first(count)
+
+    def most_expensive(self, count, in_stock=False):
+        """count самых дорогих товаров по убыванию цены."""
+        with self.__lock:
+            return self.__select_price_index(in_stock).last(count)
+
+    @property
+    def total_quantity(self):
+        """Суммарный остаток товаров категории, шт."""
+        return self.__total_quantity
+
+    @property
+    def inventory_value(self):
+        """Стоимость остатков категории: сумма цена × количество, руб."""
+        return self.__inventory_value
+
+    @property
+    def min_price(self):
+        """Минимальная цена товара категории или None для пустой категории."""
+        cheapest = self.__price_index.first(1)
+        return cheapest[0].price if cheapest else None
+
+    @property
+    def max_price(self):
+        """Максимальная цена товара категории или None для пустой категории."""
+        most_expensive = self.__price_index.last(1)
+        return most_expensive[0].price if most_expensive else None
+
+    @property
+    def average_price(self):
+        """Средняя цена товара категории или None для пустой категории."""
+        if not self.__products:
+            return None
+        return self.__price_sum / len(self.__products)
+
+    def aggregates(self):
+        """Согласованный снимок всех агрегатов категории."""
+        with self.__lock:
+            return {
+                "product_count": len(self.__products),
+                "total_quantity": self.total_quantity,
+                "inventory_value": self.inventory_value,
+                "min_price": self.min_price,
+                "max_price": self.max_price,
+                "average_price": self.average_price,
+            }
+
+    def __select_price_index(self, in_stock):
+        return self.__in_stock_index if in_stock else self.__price_index
+
+    def products_page(self, limit, after=None):
+        """
+        Страница строк товаров для постраничной выгрузки.
+        after — курсор последней полученной строки (None — с начала).
+        Возвращает (строки, курсор следующей страницы или None).
+        """
+        validate_page(limit, after)
+        start = 0 if after is None else after + 1
+        with self.__lock:
+            self.__refresh_lines()
+            lines = self.__lines[start:start + limit]
+            has_more = start + limit < len(self.__lines)
+        next_cursor = start + len(lines) - 1 if has_more else None
+        return lines, next_cursor
+
+    def iter_products(self, batch_size=1000, after=None):
+        """
+        Генератор строк товаров 'Название продукта, Цена руб. Остаток: N шт.'
+        Строки читаются страницами по batch_size, поэтому весь список
+        не копируется. after — курсор, как в products_page.
+        """
+        validate_page(batch_size, after)
+        cursor = after
+        while True:
+            lines, cursor = self.products_page(batch_size, cursor)
+            yield from lines
+            if cursor is None:
+                return
 
     @property
     def products(self):
         """
-        Возвращает список товаров категории в формате строк:
+        Возвращает товары категории в формате строк:
         'Название продукта, Цена руб. Остаток: N шт.'
+        Строки кэшируются и перерисовываются только для товаров,
+        у которых изменились цена или остаток. Возвращается
+        представление только для чтения, а не новый список.
         """
-        product_info = []
-        for product in self.__products:
-            # Используем геттер price, чтобы получить актуальную цену
-            product_info.append(f"{product.name}, {product.price} руб. "
-                                f"Остаток: {product.quantity} шт.")
-        return product_info
+        self.__refresh_lines()
+        return self.__lines_view
 
 
 if __name__ == "__main__":
+    # Сообщения сеттера цены и new_product выводим в консоль
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     # Сбросим счетчики перед каждым запуском main.py
     # для чистоты демонстрации
     Category.category_count = 0
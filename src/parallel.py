@@ -0,0 +1,104 @@
+"""
+Параллельное слияние файлов поставщиков в пуле процессов.
+
+Слияние идет в два этапа:
+    1. каждый файл читается в отдельном процессе, записи проверяются,
+       дубликаты внутри файла сливаются, а результат делится на шарды
+       по имени товара;
+    2. каждый шард сливается в отдельном процессе по правилам
+       Product.new_product: остатки складываются, выбирается более
+       высокая цена, описание берется из первой записи.
+Итоговые товары упорядочиваются по первому появлению в файлах,
+поэтому результат совпадает с последовательной загрузкой
+merge_feeds_serial.
+"""
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from .loaders import iter_records, load_into_category, normalize_record
+from .main import Category, Product, ProductRegistry
+
+
+def shard_of(name, shard_count):
+    """Номер шарда товара; не зависит от рандомизации hash() в процессах."""
+    return zlib.crc32(name.encode("utf-8")) % shard_count
+
+
+def _merge_sorted(records):
+    """
+    Сливает записи (позиция, имя, описание, цена, количество),
+    упорядоченные по позиции, по правилам new_product.
+    Возвращает список записей того же вида по первому появлению.
+    """
+    registry = ProductRegistry()
+    first_positions = {}
+    for position, name, description, price, quantity in records:
+        product = Product.new_product({"name": name, "description": description,
+                                       "price": price, "quantity": quantity}, registry)
+        first_positions.setdefault(name, (position, product))
+    return [(position, product.name, product.description, product.price, product.quantity)
+            for position, product in first_positions.values()]
+
+
+def _partition_feed(file_index, source, fmt, shard_count):
+    """
+    Этап 1: читает файл, сливает дубликаты внутри него и делит
+    результат на шарды. Некорректная запись прерывает чтение файла
+    и возвращается как (позиция, сообщение).
+    """
+    records = []
+    error = None
+    for record_index, record in enumerate(iter_records(source, fmt)):
+        try:
+            product_data = normalize_record(record)
+        except ValueError as exc:
+            error = ((file_index, record_index), str(exc))
+            break
+        records.append(((file_index, record_index), product_data["name"],
+                        product_data["description"], product_data["price"],
+                        product_data["quantity"]))
+    shards = [[] for _ in range(shard_count)]
+    for merged in _merge_sorted(records):
+        shards[shard_of(merged[1], shard_count)].append(merged)
+    return shards, error
+
+
+def _merge_shard(partials):
+    """Этап 2: сливает частичные результаты шарда из всех файлов."""
+    partials.sort(key=lambda record: record[0])
+    return _merge_sorted(partials)
+
+
+def merge_feeds(sources, name, description, fmt=None, processes=None, shards_per_process=4):
+    """
+    Сливает файлы sources (CSV или JSON Lines) в новую категорию
+    в пуле из processes процессов. Некорректная запись приводит
+    к ValueError, как при последовательной загрузке.
+    """
+    sources = [os.fspath(source) for source in sources]
+    processes = processes or os.cpu_count() or 1
+    shard_count = processes * shards_per_process
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        partitions = list(pool.map(_partition_feed, range(len(sources)), sources,
+                                   [fmt] * len(sources), [shard_count] * len(sources)))
+        errors = [error for _, error in partitions if error is not None]
+        if errors:
+            raise ValueError(min(errors)[1])
+        shard_inputs = [[record for shards, _ in partitions for record in shards[shard]]
+                        for shard in range(shard_count)]
+        merged_shards = list(pool.map(_merge_shard, shard_inputs))
+
+    merged = sorted((record for shard in merged_shards for record in shard),
+                    key=lambda record: record[0])
+    return Category(name, description,
+                    [Product(product_name, product_description, price, quantity)
+                     for _, product_name, product_description, price, quantity in merged])
+
+
+def merge_feeds_serial(sources, name, description, fmt=None):
+    """Последовательная загрузка тех же файлов для сравнения с merge_feeds."""
+    category = Category(name, description, [])
+    for source in sources:
+        load_into_category(category, source, fmt)
+    return category
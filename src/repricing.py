@@ -0,0 +1,94 @@
+"""
+Пакетная переоценка товаров категории без интерактивного ввода.
+
+Понижение цены согласуется с подключаемой политикой: любой объект
+с методом approve(product, old_price, new_price), возвращающим bool.
+Проверки сеттера price сохраняются: цена — число больше 0.
+"""
+from dataclasses import dataclass, field
+
+
+class ApprovePolicy:
+    """Политика, принимающая любое понижение цены."""
+
+    def approve(self, product, old_price, new_price):
+        return True
+
+
+class RejectPolicy:
+    """Политика, отклоняющая любое понижение цены."""
+
+    def approve(self, product, old_price, new_price):
+        return False
+
+
+class ReviewQueuePolicy:
+    """
+    Политика, откладывающая понижение цены на ручную проверку.
+    Отложенные изменения копятся в pending и применяются approve_all.
+    """
+
+    def __init__(self):
+        self.pending = []
+
+    def approve(self, product, old_price, new_price):
+        self.pending.append((product, old_price, new_price))
+        return False
+
+    def approve_all(self):
+        """Применяет все отложенные изменения и очищает очередь."""
+        applied = 0
+        pending, self.pending = self.pending, []
+        for product, _, new_price in pending:
+            applied += product.set_price(new_price, ApprovePolicy())
+        return applied
+
+
+class MaxDropPolicy:
+    """
+    Политика, принимающая понижение цены не более чем на max_drop_percent
+    процентов. Остальные решения передаются политике fallback
+    (по умолчанию — отклонение).
+    """
+
+    def __init__(self, max_drop_percent, fallback=None):
+        self.max_drop_percent = max_drop_percent
+        self.fallback = fallback if fallback is not None else RejectPolicy()
+
+    def approve(self, product, old_price, new_price):
+        if (old_price - new_price) * 100 <= old_price * self.max_drop_percent:
+            return True
+        return self.fallback.approve(product, old_price, new_price)
+
+
+@dataclass
+class RepricingReport:
+    """Итоги переоценки: имена товаров по результатам."""
+
+    applied: list = field(default_factory=list)
+    rejected: list = field(default_factory=list)
+    invalid: list = field(default_factory=list)
+    missing: list = field(default_factory=list)
+
+
+def reprice(category, updates, policy):
+    """
+    Применяет обновления цен к товарам категории за один проход.
+    updates — словарь или последовательность пар (имя, новая цена).
+    Некорректные цены (не число или <= 0) и неизвестные товары
+    попадают в отчет, понижение цены согласуется с policy.
+    """
+    if hasattr(updates, "items"):
+        updates = updates.items()
+    report = RepricingReport()
+    for name, new_price in updates:
+        product = category.find_product(name)
+        if product is None:
+            report.missing.append(name)
+        elif not isinstance(new_price, (int, float)) or new_price <= 0:
+            report.invalid.append(name)
+        elif product.set_price(new_price, policy):
+            report.applied.append(name)
+        else:
+            report.rejected.append(name)
+    return report
@@ -0,0 +1,138 @@
+"""
+Инвертированный индекс полнотекстового поиска по названию
+и описанию товаров.
+
+Индекс подписывается на Category.add_product/add_products (в том числе
+через merge_product) и обновляется автоматически. Слияние дубликатов
+по правилам new_product меняет только цену и остаток, поэтому
+поисковые токены товара при этом не меняются.
+"""
+import heapq
+import math
+import re
+from bisect import bisect_left
+from collections import defaultdict
+
+TOKEN_PATTERN = re.compile(r"\w+")
+# Вес вхождения токена в название относительно описания
+NAME_WEIGHT = 2
+
+
+def tokenize(text):
+    """
+    Токены текста: последовательности букв (кириллица и латиница)
+    и цифр в нижнем регистре, 'ё' приводится к 'е'.
+    """
+    return TOKEN_PATTERN.findall(str(text).casefold().replace("ё", "е"))
+
+
+class SearchIndex:
+    """
+    Инвертированный индекс товаров одной или нескольких категорий.
+    Поддерживает запросы с AND/OR, поиск по префиксу и ранжирование
+    по весу совпавших токенов (tf-idf с повышенным весом названия).
+    """
+
+    def __init__(self, categories=()):
+        self.__postings = defaultdict(dict)
+        # Отсортированный словарь для поиска по префиксу; новые токены
+        # копятся в __new_tokens и сливаются со словарем при запросе
+        self.__vocabulary = []
+        self.__new_tokens = []
+        self.__memberships = {}
+        self.__order = {}
+        for category in categories:
+            self.attach(category)
+
+    def attach(self, category):
+        """Индексирует товары категории и подписывается на новые."""
+        self.__on_products_added(category, list(category))
+        category.add_listener(self.__on_products_added)
+
+    def detach(self, category):
+        """Отписывается от категории. Уже проиндексированные товары остаются."""
+        category.remove_listener(self.__on_products_added)
+
+    def __on_products_added(self, category, products):
+        for product in products:
+            categories = self.__memberships.get(product)
+            if categories is None:
+                self.__memberships[product] = [category]
+                self.__order[product] = len(self.__order)
+                self.__index_text(product)
+            elif category not in categories:
+                categories.append(category)
+
+    def __index_text(self, product):
+        weights = defaultdict(int)
+        for token in tokenize(product.name):
+            weights[token] += NAME_WEIGHT
+        for token in tokenize(product.description):
+            weights[token] += 1
+        for token, weight in weights.items():
+            postings = self.__postings[token]
+            if not postings:
+                self.__new_tokens.append(token)
+            postings[product] = weight
+
+    def __len__(self):
+        return len(self.__memberships)
+
+    def __expand(self, term, prefix):
+        """Токены индекса, соответствующие слову запроса."""
+        if not prefix:
+            return [term] if term in self.__postings else []
+        if self.__new_tokens:
+            self.__vocabulary.extend(self.__new_tokens)
+            self.__vocabulary.sort()
+            self.__new_tokens.clear()
+        start = bisect_left(self.__vocabulary, term)
+        stop = start
+        while stop < len(self.__vocabulary) and self.__vocabulary[stop].startswith(term):
+            stop += 1
+        return self.__vocabulary[start:stop]
+
+    def search(self, query, mode="and", prefix=False, category=None, limit=None):
+        """
+        Ищет товары по словам запроса.
+        mode='and' — товар должен содержать все слова, 'or' — хотя бы одно;
+        prefix=True — слово запроса совпадает с началом токена;
+        category — ограничить поиск одной категорией.
+        Результаты упорядочены по убыванию релевантности.
+        """
+        if mode not in ("and", "or"):
+            raise ValueError("Режим поиска должен быть 'and' или 'or'.")
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        total = len(self.__memberships)
+        scores = None
+        for term in terms:
+            term_scores = {}
+            for token in self.__expand(term, prefix):
+                postings = self.__postings[token]
+                idf = math.log(1 + total / len(postings))
+                for product, weight in postings.items():
+                    term_scores[product] = term_scores.get(product, 0.0) + weight * idf
+            if scores is None:
+                scores = term_scores
+            elif mode == "and":
+                scores = {product: score + term_scores[product]
+                          for product, score in scores.items() if product in term_scores}
+            else:
+                for product, score in term_scores.items():
+                    scores[product] = scores.get(product, 0.0) + score
+            if mode == "and" and not scores:
+                return []
+
+        if category is not None:
+            scores = {product: score for product, score in scores.items()
+                      if category in self.__memberships[product]}
+
+        def rank(product):
+            return -scores[product], self.__order[product]
+
+        if limit is None:
+            return sorted(scores, key=rank)
+        return heapq.nsmallest(limit, scores, key=rank)
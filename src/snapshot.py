@@ -0,0 +1,199 @@
+"""
+Компактный двоичный снимок каталога: товары, категории,
+принадлежность товаров категориям и счетчики Category.
+
+Формат файла (little-endian):
+    заголовок     HEADER
+    товары        PRODUCT_RECORD × число товаров
+    категории     CATEGORY_RECORD × число категорий
+    состав        uint32 × сумма размеров категорий (номера товаров)
+    строки        uint64 × (число строк + 1) смещений и блок UTF-8
+
+При загрузке файл отображается в память (mmap), а объекты Product
+и Category создаются лениво при первом обращении.
+"""
+import mmap
+import struct
+from collections.abc import Sequence
+
+from .main import Category, Product
+
+MAGIC = b"OOPCAT01"
+# magic, товаров, категорий, строк, category_count, product_count
+HEADER = struct.Struct("<8sQQQqq")
+# цена, остаток, строка имени, строка описания, цена целая
+PRODUCT_RECORD = struct.Struct("<dqII?3x")
+# строка имени, строка описания, начало состава, размер состава
+CATEGORY_RECORD = struct.Struct("<IIQQ")
+MEMBER = struct.Struct("<I")
+OFFSET = struct.Struct("<Q")
+
+
+class _StringWriter:
+    """Таблица строк снимка: одинаковые строки записываются один раз."""
+
+    def __init__(self):
+        self.ids = {}
+        self.blobs = []
+
+    def intern(self, value):
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.blobs)
+            self.blobs.append(value.encode("utf-8"))
+        return string_id
+
+
+def save_catalog(path, categories, products=()):
+    """
+    Сохраняет категории и их товары в двоичный снимок path.
+    products — дополнительные товары вне категорий. Товар,
+    входящий в несколько категорий, сохраняется один раз.
+    Возвращает число сохраненных товаров.
+    """
+    categories = list(categories)
+    product_ids = {}
+    product_table = []
+    memberships = []
+    for product in [*products, *(product for category in categories for product in category)]:
+        if product not in product_ids:
+            product_ids[product] = len(product_table)
+            product_table.append(product)
+    for category in categories:
+        memberships.append([product_ids[product] for product in category])
+
+    strings = _StringWriter()
+    product_records = [PRODUCT_RECORD.pack(float(product.price), product.quantity,
+                                           strings.intern(product.name),
+                                           strings.intern(product.description),
+                                           isinstance(product.price, int))
+                       for product in product_table]
+    category_records = []
+    member_offset = 0
+    for category, members in zip(categories, memberships):
+        category_records.append(CATEGORY_RECORD.pack(
+            strings.intern(category.name), strings.intern(category.description),
+            member_offset, len(members)))
+        member_offset += len(members)
+
+    counts = Category.snapshot_counts()
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(product_table), len(categories), len(strings.blobs),
+                               counts["category_count"], counts["product_count"]))
+        file.writelines(product_records)
+        file.writelines(category_records)
+        for members in memberships:
+            file.write(struct.pack(f"<{len(members)}I", *members))
+        offset = 0
+        for blob in strings.blobs:
+            file.write(OFFSET.pack(offset))
+            offset += len(blob)
+        file.write(OFFSET.pack(offset))
+        file.writelines(strings.blobs)
+    return len(product_table)
+
+
+class _LazySequence(Sequence):
+    """Последовательность объектов снимка, создаваемых при первом обращении."""
+
+    def __init__(self, size, factory):
+        self._size = size
+        self._factory = factory
+        self._cache = {}
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        if not -self._size <= index < self._size:
+            raise IndexError("Номер вне диапазона снимка.")
+        index %= self._size
+        item = self._cache.get(index)
+        if item is None:
+            item = self._cache[index] = self._factory(index)
+        return item
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def materialized(self):
+        """Количество уже созданных объектов."""
+        return len(self._cache)
+
+
+class CatalogSnapshot:
+    """
+    Снимок каталога, отображенный в память. Товары и категории
+    доступны через products и categories и создаются лениво.
+    """
+
+    def __init__(self, path, restore_counts=True):
+        self._file = open(path, "rb")
+        try:
+            self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError("Файл снимка пуст.") from None
+        if len(self._buffer) < HEADER.size or self._buffer[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError("Файл не является снимком каталога.")
+        (_, product_total, category_total, string_total,
+         category_count, product_count) = HEADER.unpack_from(self._buffer)
+        self.counts = {"category_count": category_count, "product_count": product_count}
+        self._products_offset = HEADER.size
+        self._categories_offset = self._products_offset + product_total * PRODUCT_RECORD.size
+        self._members_offset = self._categories_offset + category_total * CATEGORY_RECORD.size
+        member_total = sum(self._category_record(index)[3] for index in range(category_total))
+        self._string_offsets = self._members_offset + member_total * MEMBER.size
+        self._strings_offset = self._string_offsets + (string_total + 1) * OFFSET.size
+        self.products = _LazySequence(product_total, self._load_product)
+        self.categories = _LazySequence(category_total, self._load_category)
+        if restore_counts:
+            Category.restore_counts(self.counts)
+
+    def _string(self, string_id):
+        start, stop = struct.unpack_from("<QQ", self._buffer,
+                                         self._string_offsets + string_id * OFFSET.size)
+        return str(self._buffer[self._strings_offset + start:self._strings_offset + stop],
+                   "utf-8")
+
+    def _category_record(self, index):
+        return CATEGORY_RECORD.unpack_from(self._buffer,
+                                           self._categories_offset + index * CATEGORY_RECORD.size)
+
+    def _load_product(self, index):
+        price, quantity, name_id, description_id, integer_price = PRODUCT_RECORD.unpack_from(
+            self._buffer, self._products_offset + index * PRODUCT_RECORD.size)
+        if integer_price:
+            price = int(price)
+        return Product(self._string(name_id), self._string(description_id), price, quantity)
+
+    def _load_category(self, index):
+        name_id, description_id, start, size = self._category_record(index)
+        members = struct.unpack_from(f"<{size}I", self._buffer,
+                                     self._members_offset + start * MEMBER.size)
+        # Создание категории из снимка не должно менять восстановленные счетчики
+        counts = Category.snapshot_counts()
+        category = Category(self._string(name_id), self._string(description_id),
+                            [self.products[member] for member in members])
+        Category.restore_counts(counts)
+        return category
+
+    def close(self):
+        """Закрывает отображение файла. Созданные объекты остаются доступны."""
+        self._buffer.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_catalog(path, restore_counts=True):
+    """
+    Открывает снимок каталога. При restore_counts=True счетчики
+    Category восстанавливаются из снимка.
+    """
+    return CatalogSnapshot(path, restore_counts)
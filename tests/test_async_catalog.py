@@ -0,0 +1,192 @@
+import asyncio
+
+import pytest
+
+from src.main import Category, Product
+from src.async_catalog import AsyncCatalogService, NewProduct, PriceUpdate, StockUpdate
+from src.repricing import ApprovePolicy
+
+
+@pytest.fixture(autouse=True)
+def no_input(monkeypatch):
+    """Сервис не должен обращаться к интерактивному вводу."""
+    def fail(_):
+        raise AssertionError("input() вызван в асинхронном сервисе")
+    monkeypatch.setattr('builtins.input', fail)
+
+
+def test_concurrent_producers():
+    """Проверяем применение потоков обновлений от нескольких производителей."""
+    category = Category("Кат", "Описание", [Product("Т1", "О1", 100.0, 0)])
+
+    async def producer(service, index):
+        for step in range(50):
+            await service.submit(StockUpdate("Т1", 1))
+            await service.submit(NewProduct({"name": f"П{index}", "description": "О",
+                                             "price": 10.0, "quantity": 1}))
+            await asyncio.sleep(0)
+
+    async def scenario():
+        async with AsyncCatalogService(category, max_queue=8, batch_size=16) as service:
+            await asyncio.gather(*(producer(service, index) for index in range(4)))
+            await service.submit(PriceUpdate("Т1", 150.0))
+            await service.flush()
+            # Понижение цены отклоняется политикой по умолчанию
+            await service.submit(PriceUpdate("Т1", 50.0))
+            await service.flush()
+            return service
+
+    service = asyncio.run(scenario())
+    product = category.find_product("Т1")
+    assert product.quantity == 200
+    assert product.price == 150.0
+    assert service.stats["price_rejected"] == 1
+    assert [category.find_product(f"П{index}").quantity for index in range(4)] == [50] * 4
+    assert service.stats["updates"] == 402
+    assert service.stats["batches"] < 402
+
+
+def test_price_updates_in_arrival_order():
+    """Проверяем, что цены пакета применяются по очереди, как при отдельной отправке."""
+    category = Category("Кат", "Описание", [Product("Т1", "О1", 100.0, 1)])
+
+    async def scenario():
+        service = AsyncCatalogService(category, batch_size=10)
+        for price in (110.0, 130.0, 120.0):
+            await service.submit(PriceUpdate("Т1", price))
+        await service.submit(StockUpdate("Неизвестный", 1))
+        await service.start()
+        await service.close()
+        return service
+
+    service = asyncio.run(scenario())
+    # 120.0 после 130.0 — понижение, его отклоняет политика по умолчанию
+    assert category.find_product("Т1").price == 130.0
+    assert service.stats["batches"] == 1
+    assert service.stats["price_applied"] == 2
+    assert service.stats["price_rejected"] == 1
+    assert service.stats["missing"] == 1
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 100])
+def test_result_independent_of_batching(batch_size):
+    """Проверяем, что результат не зависит от разбиения очереди на пакеты."""
+    category = Category("Кат", "Описание", [Product("Т1", "О1", 100.0, 1)])
+    updates = [
+        StockUpdate("Т3", 1),
+        StockUpdate("Т3", 1),
+        StockUpdate("Т2", 5),
+        PriceUpdate("Т1", 90.0),
+        NewProduct({"name": "Т1", "description": "О1", "price": 95.0, "quantity": 2}),
+        NewProduct({"name": "Т2", "description": "О2", "price": 10.0, "quantity": 1}),
+        StockUpdate("Т2", 3),
+        StockUpdate("Т1", -1),
+        PriceUpdate("Т2", 12.0),
+    ]
+
+    async def scenario():
+        service = AsyncCatalogService(category, batch_size=batch_size, policy=ApprovePolicy())
+        for update in updates:
+            await service.submit(update)
+        await service.start()
+        await service.close()
+        return service
+
+    service = asyncio.run(scenario())
+    first, second = category.find_product("Т1"), category.find_product("Т2")
+    assert (first.price, first.quantity) == (95.0, 2)
+    assert (second.price, second.quantity) == (12.0, 4)
+    assert service.stats["missing"] == 3
+    assert service.stats["updates"] == len(updates)
+
+
+def test_backpressure():
+    """Проверяем, что submit ждет при заполненной очереди."""
+    category = Category("Кат", "Описание", [Product("Т1", "О1", 100.0, 1)])
+
+    async def scenario():
+        service = AsyncCatalogService(category, max_queue=2)
+        await service.submit(StockUpdate("Т1", 1))
+        await service.submit(StockUpdate("Т1", 1))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(service.submit(StockUpdate("Т1", 1)), timeout=0.05)
+        await service.start()
+        await service.submit(StockUpdate("Т1", 1))
+        await service.close()
+
+    asyncio.run(scenario())
+    assert category.find_product("Т1").quantity == 4
+
+
+def test_invalid_records_reported():
+    """Проверяем, что ошибка записи не останавливает обработку."""
+    category = Category("Кат", "Описание", [])
+
+    async def scenario():
+        async with AsyncCatalogService(category) as service:
+            await service.submit(NewProduct({"name": "Неполный"}))
+            await service.submit(NewProduct({"name": "Т1", "description": "О", "price": 1.0,
+                                             "quantity": 1}))
+        return service
+
+    service = asyncio.run(scenario())
+    assert len(service.errors) == 1
+    assert category.find_product("Т1") is not None
+
+
+def test_bad_updates_do_not_stop_worker():
+    """Проверяем, что ошибочное обновление не останавливает обработку очереди."""
+    category = Category("Кат", "Описание", [Product("Т1", "О1", 100.0, 1)])
+
+    async def scenario():
+        async with AsyncCatalogService(category) as service:
+            with pytest.raises(TypeError):
+                await service.submit(("Т1", 5))
+            await service.submit(NewProduct(None))
+            await service.submit(StockUpdate("Т1", "много"))
+            await asyncio.wait_for(service.flush(), timeout=5)
+            await service.submit(StockUpdate("Т1", 2))
+            await asyncio.wait_for(service.flush(), timeout=5)
+        return service
+
+    service = asyncio.run(scenario())
+    assert len(service.errors) == 2
+    assert {type(update) for update, _ in service.errors} == {NewProduct, StockUpdate}
+    assert category.find_product("Т1").quantity == 3
+
+
+def test_flush_before_start():
+    """Проверяем, что flush() и close() без start() применяют очередь."""
+    category = Category("Кат", "Описание", [Product("Т1", "О1", 100.0, 1)])
+
+    async def scenario():
+        service = AsyncCatalogService(category)
+        await service.submit(StockUpdate("Т1", 2))
+        await asyncio.wait_for(service.flush(), timeout=5)
+        assert category.find_product("Т1").quantity == 3
+
+        idle = AsyncCatalogService(category)
+        await idle.submit(StockUpdate("Т1", 1))
+        await asyncio.wait_for(idle.close(), timeout=5)
+        await service.close()
+
+    asyncio.run(scenario())
+    assert category.find_product("Т1").quantity == 4
+
+
+def test_failed_batch_reported_per_update(monkeypatch):
+    """Проверяем, что ошибка всего пакета записывается по каждому обновлению."""
+    category = Category("Кат", "Описание", [Product("Т1", "О1", 100.0, 1)])
+    updates = [StockUpdate("Т1", 1), PriceUpdate("Т1", 120.0)]
+
+    async def scenario():
+        service = AsyncCatalogService(category)
+        monkeypatch.setattr(service, "_apply", lambda batch: 1 / 0)
+        for update in updates:
+            await service.submit(update)
+        await asyncio.wait_for(service.close(), timeout=5)
+        return service
+
+    service = asyncio.run(scenario())
+    assert [update for update, _ in service.errors] == updates
+    assert all(isinstance(exc, ZeroDivisionError) for _, exc in service.errors)
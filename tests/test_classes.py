@@ -1,3 +1,9 @@
+import copy
+import gc
+import pickle
+import threading
+import weakref
+
 import pytest
 import sys
 import os
@@ -12,7 +18,7 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
 
 # Теперь импорт из src.main должен работать
-from src.main import Product, Category
+from src.main import Product, Category, PriceIndex, ProductRegistry, ShardedCounter, normalize_name
 
 # Фикстура Pytest для сброса счетчиков перед каждым тестом
 @pytest.fixture(autouse=True)
@@ -203,3 +209,336 @@ def test_new_product_missing_data_raises_error():
     product_data = {"name": "Неполный", "price": 100.0} # Нет описания и количества
     with pytest.raises(ValueError, match="Недостаточно данных для создания продукта."):
         Product.new_product(product_data)
+
+
+def test_new_product_with_registry():
+    """Проверяем поиск дубликатов через ProductRegistry."""
+    registry = ProductRegistry()
+    data = {"name": "Товар", "description": "Описание", "price": 50.0, "quantity": 5}
+    created = Product.new_product(data, products_list=registry)
+    assert len(registry) == 1
+    assert registry.get("Товар") is created
+
+    data_again = {"name": "Товар", "description": "Другое", "price": 70.0, "quantity": 3}
+    merged = Product.new_product(data_again, products_list=registry)
+    assert merged is created
+    assert merged.quantity == 8
+    assert merged.price == 70.0
+    assert merged.description == "Описание"
+    assert len(registry) == 1
+
+
+def test_registry_normalized_key():
+    """Проверяем нормализованный ключ реестра."""
+    product = Product("Iphone  15", "512GB", 210000.0, 8)
+    registry = ProductRegistry([product], key_func=normalize_name)
+    assert "iphone 15" in registry
+    assert registry.get(" IPHONE 15 ") is product
+    assert registry.add(Product("iphone 15", "Дубликат", 1.0, 1)) is False
+
+
+def test_category_merge_product():
+    """Проверяем слияние товаров из словарей в категорию."""
+    category = Category("Кат", "Описание", [Product("Т1", "О1", 10.0, 1)])
+    merged = category.merge_product({"name": "Т1", "description": "О", "price": 15.0, "quantity": 2})
+    assert merged is category.find_product("Т1")
+    assert Category.product_count == 1
+
+    category.merge_product({"name": "Т2", "description": "О2", "price": 20.0, "quantity": 2})
+    assert Category.product_count == 2
+    assert category.products == ["Т1, 15.0 руб. Остаток: 3 шт.", "Т2, 20.0 руб. Остаток: 2 шт."]
+
+
+def test_products_cached_view():
+    """Проверяем, что products возвращает один и тот же кэшированный вид."""
+    category = Category("Кат", "Описание", [Product("Т1", "О1", 10.0, 1)])
+    lines = category.products
+    assert category.products is lines
+    with pytest.raises(TypeError):
+        lines[0] = "Изменено"
+
+
+def test_products_cache_invalidation(monkeypatch):
+    """Проверяем перерисовку строк при изменении цены и остатка."""
+    product = Product("Т1", "О1", 10.0, 1)
+    other = Product("Т2", "О2", 20.0, 2)
+    category = Category("Кат", "Описание", [product, other])
+    lines = category.products
+
+    product.price = 15.0
+    product.quantity += 4
+    assert lines[0] == "Т1, 15.0 руб. Остаток: 5 шт."
+    assert lines[1] == "Т2, 20.0 руб. Остаток: 2 шт."
+
+    monkeypatch.setattr('builtins.input', lambda _: 'n')
+    other.price = 5.0
+    assert category.products[1] == "Т2, 20.0 руб. Остаток: 2 шт."
+
+    category.merge_product({"name": "Т2", "description": "О2", "price": 25.0, "quantity": 1})
+    assert category.products == ["Т1, 15.0 руб. Остаток: 5 шт.", "Т2, 25.0 руб. Остаток: 3 шт."]
+
+
+def test_product_listeners():
+    """Проверяем оповещение подписчиков об изменениях товара."""
+    product = Product("Т1", "О1", 10.0, 1)
+    events = []
+
+    def listener(*event):
+        events.append(event)
+
+    product.add_listener(listener)
+    product.price = 12.0
+    product.quantity = 3
+    product.remove_listener(listener)
+    product.quantity = 4
+    assert events == [(product, "price", 10.0, 12.0), (product, "quantity", 1, 3)]
+
+
+def test_counts_snapshot_api():
+    """Проверяем снимок, восстановление и сброс счетчиков."""
+    category = Category("Кат", "Описание", [Product("Т1", "О1", 1.0, 1)])
+    snapshot = Category.snapshot_counts()
+    assert snapshot == {"category_count": 1, "product_count": 1}
+    assert category.product_count == 1
+
+    Category("Кат2", "Описание", [Product("Т2", "О2", 1.0, 1)])
+    Category.restore_counts(snapshot)
+    assert Category.category_count == 1
+    assert Category.product_count == 1
+
+    Category.reset_counts()
+    assert Category.snapshot_counts() == {"category_count": 0, "product_count": 0}
+
+
+def test_concurrent_merge_product():
+    """Проверяем слияние товаров в категорию из пула потоков."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    category = Category("Кат", "Описание", [])
+    records = [{"name": f"Т{i % 50}", "description": "О", "price": float(i % 7 + 1), "quantity": 1}
+               for i in range(2000)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(category.merge_product, records))
+
+    assert len(category) == 50
+    assert Category.product_count == 50
+    assert sum(product.quantity for product in category) == 2000
+    assert all(product.price == 7.0 for product in category)
+
+
+def test_price_index_queries():
+    """Проверяем запросы по отсортированному индексу цен."""
+    products = [Product(f"Т{price}", "О", float(price), price % 3) for price in (50, 10, 40, 20, 30)]
+    category = Category("Кат", "Описание", products)
+
+    assert [p.price for p in category.range_by_price(20, 40)] == [20.0, 30.0, 40.0]
+    assert [p.price for p in category.cheapest(2)] == [10.0, 20.0]
+    assert [p.price for p in category.most_expensive(2)] == [50.0, 40.0]
+    assert category.most_expensive(0) == []
+    # В наличии товары с остатком 50 % 3 = 2, 10 % 3 = 1, 40 % 3 = 1, 20 % 3 = 2
+    assert [p.price for p in category.cheapest(10, in_stock=True)] == [10.0, 20.0, 40.0, 50.0]
+
+
+def test_price_index_follows_changes(monkeypatch):
+    """Проверяем, что индекс цен следует за сеттерами цены и остатка."""
+    cheap = Product("Дешевый", "О", 10.0, 0)
+    expensive = Product("Дорогой", "О", 100.0, 1)
+    category = Category("Кат", "Описание", [cheap, expensive])
+    assert category.cheapest(1, in_stock=True) == [expensive]
+
+    cheap.quantity = 5
+    assert category.cheapest(1, in_stock=True) == [cheap]
+
+    cheap.price = 200.0
+    assert category.most_expensive(1) == [cheap]
+    assert category.range_by_price(150, 250, in_stock=True) == [cheap]
+
+    monkeypatch.setattr('builtins.input', lambda _: 'y')
+    cheap.price = 5.0
+    cheap.quantity = 0
+    assert category.cheapest(1) == [cheap]
+    assert category.cheapest(1, in_stock=True) == [expensive]
+
+
+def test_category_aggregates(monkeypatch):
+    """Проверяем агрегаты категории и их обновление при изменениях."""
+    empty = Category("Пусто", "Описание", [])
+    assert empty.aggregates() == {"product_count": 0, "total_quantity": 0, "inventory_value": 0,
+                                  "min_price": None, "max_price": None, "average_price": None}
+
+    product1 = Product("Т1", "О1", 10.0, 2)
+    product2 = Product("Т2", "О2", 30.0, 1)
+    category = Category("Кат", "Описание", [product1, product2])
+    assert category.total_quantity == 3
+    assert category.inventory_value == 50.0
+    assert (category.min_price, category.max_price, category.average_price) == (10.0, 30.0, 20.0)
+
+    Product.new_product({"name": "Т1", "description": "О1", "price": 40.0, "quantity": 3}, [product1])
+    assert category.total_quantity == 6
+    assert category.inventory_value == pytest.approx(40.0 * 5 + 30.0)
+    assert category.max_price == 40.0
+
+    monkeypatch.setattr('builtins.input', lambda _: 'y')
+    product2.price = 5.0
+    category.add_product(Product("Т3", "О3", 15.0, 0))
+    assert category.aggregates() == pytest.approx({
+        "product_count": 3, "total_quantity": 6, "inventory_value": 40.0 * 5 + 5.0,
+        "min_price": 5.0, "max_price": 40.0, "average_price": 20.0})
+
+
+def test_products_pagination():
+    """Проверяем постраничное чтение строк товаров по курсору."""
+    category = Category("Кат", "Описание", [Product(f"Т{i}", "О", 1.0, i) for i in range(5)])
+    lines, cursor = category.products_page(2)
+    assert lines == ["Т0, 1.0 руб. Остаток: 0 шт.", "Т1, 1.0 руб. Остаток: 1 шт."]
+    lines, cursor = category.products_page(2, after=cursor)
+    assert lines == ["Т2, 1.0 руб. Остаток: 2 шт.", "Т3, 1.0 руб. Остаток: 3 шт."]
+    lines, cursor = category.products_page(2, after=cursor)
+    assert lines == ["Т4, 1.0 руб. Остаток: 4 шт."]
+    assert cursor is None
+
+    assert list(category.iter_products(batch_size=2)) == list(category.products)
+    assert list(category.iter_products(batch_size=3, after=2)) == list(category.products)[3:]
+
+
+@pytest.mark.parametrize("limit, after", [(0, None), (-1, None), (2.0, None), (True, None),
+                                          (2, -2), (2, 1.5), (2, "0"), (2, False)])
+def test_products_page_rejects_bad_arguments(limit, after):
+    """Проверяем отказ для страниц, по которым курсор не продвигался бы."""
+    category = Category("Кат", "Описание", [Product(f"Т{i}", "О", 1.0, i) for i in range(3)])
+    with pytest.raises(ValueError):
+        category.products_page(limit, after)
+    with pytest.raises(ValueError):
+        next(category.iter_products(batch_size=limit, after=after))
+    assert category.products_page(2, after=-1)[0] == list(category.products)[:2]
+
+
+def test_product_copy_and_pickle_drop_listeners():
+    """Проверяем, что копии товара не разделяют подписчиков с оригиналом."""
+    category = Category("Кат", "Описание", [Product("Т1", "О1", 10.0, 1)])
+    product = category.find_product("Т1")
+
+    shallow = copy.copy(product)
+    deep = copy.deepcopy(product)
+    restored = pickle.loads(pickle.dumps(product))
+    for clone in (shallow, deep, restored):
+        assert clone is not product
+        assert (clone.name, clone.price, clone.quantity) == ("Т1", 10.0, 1)
+        clone.quantity = 7
+    assert category.total_quantity == 1
+
+    product.quantity = 3
+    assert category.total_quantity == 3
+
+
+def test_category_collected_while_products_live():
+    """Проверяем, что подписка товара не удерживает категорию в памяти."""
+    product = Product("Т1", "О1", 10.0, 1)
+    category = Category("Кат", "Описание", [product])
+    category_ref = weakref.ref(category)
+    del category
+    gc.collect()
+    assert category_ref() is None
+
+    product.price = 12.0
+    assert product._listeners == []
+
+
+def test_concurrent_merge_shared_product():
+    """Проверяем слияние общего товара в две категории из двух потоков."""
+    shared = Product("Общий", "О", 10.0, 0)
+    first = Category("Кат1", "Описание", [shared])
+    second = Category("Кат2", "Описание", [shared])
+    record = {"name": "Общий", "description": "О", "price": 10.0, "quantity": 1}
+
+    def merge(category):
+        for _ in range(2000):
+            category.merge_products([record])
+            category.merge_product(record)
+
+    threads = [threading.Thread(target=merge, args=(category,), daemon=True)
+               for category in (first, second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    assert not any(thread.is_alive() for thread in threads)
+
+    assert shared.quantity == 8000
+    assert first.total_quantity == second.total_quantity == 8000
+
+
+def test_sharded_counter_folds_finished_threads():
+    """Проверяем, что ячейки завершившихся потоков не накапливаются."""
+    counter = ShardedCounter(5)
+    counter.add(2)
+    for _ in range(20):
+        threads = [threading.Thread(target=counter.add, args=(3,)) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert counter.value == 5 + 2 + 20 * 10 * 3
+    assert counter.shard_count == 1
+    counter.reset()
+    assert counter.value == 0
+
+
+def test_sharded_counter_retires_own_cell():
+    """Проверяем, что поток забирает свою ячейку, даже если в другой то же значение."""
+    counter = ShardedCounter()
+    counter.add(3)
+    thread = threading.Thread(target=counter.add, args=(3,))
+    thread.start()
+    thread.join()
+    counter.add(1)
+    assert counter.value == 7
+
+
+def test_price_index_concurrent_setters(monkeypatch):
+    """Проверяем индекс цен и агрегаты при смене цен и остатков из нескольких потоков."""
+    monkeypatch.setattr('builtins.input', lambda _: 'y')
+    products = [Product(f"Т{i}", "О", 10.0, 1) for i in range(3)]
+    category = Category("Кат", "Описание", products)
+    errors = []
+
+    def worker(seed):
+        try:
+            for step in range(5000):
+                product = products[(seed + step) % 3]
+                product.price = float((seed * 7 + step) % 50 + 1)
+                product.quantity = (seed + step) % 3
+        except Exception as exc:
+            errors.append(exc)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    by_price = sorted(products, key=lambda product: product.price)
+    assert [p.price for p in category.cheapest(100)] == [p.price for p in by_price]
+    assert set(category.cheapest(100)) == set(products)
+    assert set(category.cheapest(100, in_stock=True)) == {p for p in products if p.quantity > 0}
+    assert category.total_quantity == sum(p.quantity for p in products)
+    assert category.inventory_value == pytest.approx(sum(p.price * p.quantity for p in products))
+
+
+def test_price_index_remove_missing_key():
+    """Проверяем, что удаление отсутствующей записи не задевает соседние."""
+    index = PriceIndex()
+    index.add(10.0, 0, "a")
+    index.add(20.0, 1, "b")
+    with pytest.raises(ValueError):
+        index.remove(15.0, 0)
+    with pytest.raises(ValueError):
+        index.remove(30.0, 1)
+    assert index.first(10) == ["a", "b"]
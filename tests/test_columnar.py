@@ -0,0 +1,91 @@
+import copy
+import pickle
+
+import pytest
+
+from src.main import Category, Product
+from src.columnar import ProductColumns, ProductRow
+
+
+@pytest.fixture
+def columns():
+    return ProductColumns([
+        Product("Samsung Galaxy S23 Ultra", "256GB, Серый цвет, 200MP камера", 180000.0, 5),
+        Product("Iphone 15", "512GB, Gray space", 210000.0, 8),
+        Product("Xiaomi Redmi Note 11", "1024GB, Синий", 31000.0, 14),
+    ])
+
+
+def test_rows_are_product_views(columns):
+    """Проверяем, что строки хранилища ведут себя как Product."""
+    row = columns.row(1)
+    assert isinstance(row, Product)
+    assert row.name == "Iphone 15"
+    assert row.price == 210000.0
+
+    row.price = 220000.0
+    row.quantity += 2
+    assert columns.prices[1] == 220000.0
+    assert columns.row(1).quantity == 10
+    assert columns.row(1) == row
+
+
+def test_row_price_setter_rules(columns):
+    """Проверяем, что сеттер цены сохраняет проверки Product."""
+    row = columns.row(0)
+    row.price = -1
+    row.price = "abc"
+    assert row.price == 180000.0
+
+
+def test_strings_are_interned():
+    """Проверяем интернирование повторяющихся строк."""
+    columns = ProductColumns()
+    columns.append("Т1", "Общее описание", 1.0, 1)
+    columns.append("Т2", "Общее описание", 2.0, 2)
+    assert len(columns.strings) == 3
+
+
+def test_vectorized_aggregates(columns):
+    """Проверяем векторные операции над колонками."""
+    assert columns.total_value() == 180000.0 * 5 + 210000.0 * 8 + 31000.0 * 14
+    assert list(columns.price_mask(100000, 200000)) == [True, False, False]
+    assert [row.name for row in columns.price_range(0, 190000)] == [
+        "Samsung Galaxy S23 Ultra", "Xiaomi Redmi Note 11"]
+    assert list(columns.argsort_by_price()) == [2, 0, 1]
+    assert [row.name for row in columns.sorted_by_price(descending=True)][0] == "Iphone 15"
+
+    columns.adjust_quantities(-1, mask=[True, False, True])
+    assert list(columns.quantities) == [4, 8, 13]
+    columns.adjust_quantities(1)
+    assert list(columns.quantities) == [5, 9, 14]
+
+
+def test_rows_in_category(columns):
+    """Проверяем, что строки можно добавлять в Category."""
+    category = Category("Смартфоны", "Описание", columns)
+    assert len(category) == 3
+    assert category.products[2] == "Xiaomi Redmi Note 11, 31000.0 руб. Остаток: 14 шт."
+    assert isinstance(category.find_product("Iphone 15"), ProductRow)
+
+
+def test_adjust_quantities_refreshes_category(columns):
+    """Проверяем, что массовое изменение остатков видно в категории."""
+    category = Category("Смартфоны", "Описание", columns)
+    assert category.products[0] == "Samsung Galaxy S23 Ultra, 180000.0 руб. Остаток: 5 шт."
+    columns.adjust_quantities(10)
+    assert category.products[0] == "Samsung Galaxy S23 Ultra, 180000.0 руб. Остаток: 15 шт."
+
+
+def test_row_copy_and_pickle(columns):
+    """Проверяем копирование и сериализацию строк без подписчиков."""
+    category = Category("Кат", "Описание", [columns.row(0)])
+    row = columns.row(0)
+    assert columns.listeners[0]
+
+    assert copy.copy(row) == row
+    restored = pickle.loads(pickle.dumps(row))
+    assert restored.name == row.name and restored.price == row.price
+    assert restored._columns.listeners == {}
+    restored.quantity = 100
+    assert category.total_quantity == 5
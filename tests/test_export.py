@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+
+import pytest
+
+from src.main import Category, Product
+from src.export import iter_export_chunks, write_products
+
+
+@pytest.fixture
+def category():
+    return Category("Смартфоны", "Описание", [
+        Product("Samsung Galaxy S23 Ultra", "256GB, Серый цвет, 200MP камера", 180000.0, 5),
+        Product("Iphone 15", "512GB, Gray space", 210000.0, 8),
+        Product("Xiaomi Redmi Note 11", "1024GB, Синий", 31000.0, 14),
+    ])
+
+
+def test_write_text(category):
+    """Проверяем выгрузку строк в формате Category.products."""
+    file = io.StringIO()
+    write_products(category, file, batch_size=2)
+    assert file.getvalue().splitlines() == list(category.products)
+    assert len(list(iter_export_chunks(category, batch_size=2))) == 2
+
+
+def test_write_csv(category):
+    """Проверяем выгрузку в CSV."""
+    file = io.StringIO()
+    write_products(category, file, fmt="csv", batch_size=2)
+    rows = list(csv.DictReader(io.StringIO(file.getvalue())))
+    assert [row["name"] for row in rows] == ["Samsung Galaxy S23 Ultra", "Iphone 15",
+                                             "Xiaomi Redmi Note 11"]
+    assert rows[0]["description"] == "256GB, Серый цвет, 200MP камера"
+
+    empty = io.StringIO()
+    write_products(Category("Пусто", "Описание", []), empty, fmt="csv")
+    assert empty.getvalue().strip() == "name,description,price,quantity"
+
+
+def test_write_jsonl_after_cursor(category):
+    """Проверяем выгрузку JSON Lines, начиная с курсора."""
+    file = io.StringIO()
+    write_products(category, file, fmt="jsonl", after=0)
+    records = [json.loads(line) for line in file.getvalue().splitlines()]
+    assert records == [
+        {"name": "Iphone 15", "description": "512GB, Gray space", "price": 210000.0, "quantity": 8},
+        {"name": "Xiaomi Redmi Note 11", "description": "1024GB, Синий", "price": 31000.0,
+         "quantity": 14},
+    ]
+
+
+def test_unknown_format(category):
+    """Проверяем отказ для неизвестного формата."""
+    with pytest.raises(ValueError, match="Неизвестный формат выгрузки"):
+        write_products(category, io.StringIO(), fmt="xml")
+
+
+@pytest.mark.parametrize("fmt", ["text", "csv", "jsonl"])
+@pytest.mark.parametrize("batch_size, after", [(0, None), (2, -5), (2, 0.5)])
+def test_bad_page_arguments(category, fmt, batch_size, after):
+    """Проверяем отказ для неверного размера страницы или курсора."""
+    with pytest.raises(ValueError):
+        write_products(category, io.StringIO(), fmt=fmt, batch_size=batch_size, after=after)
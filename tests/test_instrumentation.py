@@ -0,0 +1,64 @@
+import logging
+
+from src import instrumentation
+from src.main import Category, Product
+from src.repricing import RejectPolicy
+
+
+def test_profile_collects_stats():
+    """Проверяем счетчики вызовов, дубликатов и отклоненных цен."""
+    with instrumentation.profile() as profiler:
+        product = Product.new_product({"name": "Т1", "description": "О", "price": 10.0, "quantity": 1})
+        Product.new_product({"name": "Т1", "description": "О", "price": 5.0, "quantity": 1}, [product])
+        category = Category("Кат", "Описание", [])
+        category.add_product(product)
+        product.price = -1
+        product.set_price(1.0, RejectPolicy())
+        product.price = 20.0
+
+    stats = profiler.stats()
+    operations = stats["operations"]
+    assert operations["Product.new_product"]["calls"] == 2
+    assert operations["Product.__init__"]["calls"] == 1
+    assert operations["Category.add_product"]["calls"] == 1
+    assert operations["Product.set_price"]["calls"] == 3
+    assert operations["Product.set_price"]["p99_us"] >= operations["Product.set_price"]["p50_us"]
+    assert stats["duplicate_hit_rate"] == 0.5
+    assert stats["rejected_price_updates"] == 2
+    assert instrumentation.stats() is None
+
+
+def test_enable_disable():
+    """Проверяем явное включение и выключение замеров."""
+    profiler = instrumentation.enable()
+    try:
+        Product("Т1", "О", 1.0, 1)
+        assert instrumentation.stats()["operations"]["Product.__init__"]["calls"] == 1
+    finally:
+        assert instrumentation.disable() is profiler
+    Product("Т2", "О", 1.0, 1)
+    assert profiler.calls["Product.__init__"] == 1
+
+
+def test_messages_go_through_logger(caplog):
+    """Проверяем, что сообщения идут через логгер и его можно отключить."""
+    product = Product("Т1", "О", 10.0, 1)
+    with caplog.at_level(logging.INFO, logger="src.main"):
+        product.price = 0
+        Product.new_product({"name": "Т1", "description": "О", "price": 5.0, "quantity": 1}, [product])
+    assert "Цена не должна быть нулевая или отрицательная" in caplog.text
+    assert "Найден дубликат товара: 'Т1'" in caplog.text
+
+    caplog.clear()
+    with caplog.at_level(logging.ERROR, logger="src.main"):
+        product.price = "abc"
+    assert caplog.text == ""
+
+
+def test_percentile_nearest_rank():
+    """Проверяем процентили по ближайшему рангу."""
+    values = list(range(1, 101))
+    assert instrumentation.percentile(values, 0.50) == 50
+    assert instrumentation.percentile(values, 0.99) == 99
+    assert instrumentation.percentile([7], 0.95) == 7
+    assert instrumentation.percentile([], 0.5) == 0.0
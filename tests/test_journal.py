@@ -0,0 +1,165 @@
+import os
+import threading
+import time
+
+import pytest
+
+from src.main import Category, Product
+from src.columnar import ProductColumns
+from src.journal import Journal
+from src.parallel import merge_feeds
+from src.repricing import RejectPolicy
+
+from .test_parallel import write_feeds
+
+
+def state(categories):
+    return [(category.name, list(category.products)) for category in categories]
+
+
+def build_catalog():
+    """Изменения каталога, которые должны попасть в журнал."""
+    product = Product("Iphone 15", "512GB, Gray space", 210000.0, 8)
+    category = Category("Смартфоны", "Описание", [product])
+    category.merge_product({"name": "Iphone 15", "description": "Другое", "price": 215000.0,
+                            "quantity": 2})
+    category.merge_product({"name": "Xiaomi Redmi Note 11", "description": "1024GB, Синий",
+                            "price": 31000.0, "quantity": 14})
+    product.set_price(100000.0, RejectPolicy())
+    product.price = -1
+    category.find_product("Xiaomi Redmi Note 11").quantity -= 4
+    return [category]
+
+
+@pytest.fixture(autouse=True)
+def reset_counts():
+    Category.reset_counts()
+
+
+def test_replay_rebuilds_state(tmp_path):
+    """Проверяем восстановление состояния из журнала."""
+    with Journal(tmp_path, buffer_size=2) as journal:
+        categories = build_catalog()
+    expected = state(categories)
+    counts = Category.snapshot_counts()
+
+    Category.reset_counts()
+    recovered = Journal(tmp_path)
+    recovered.close()
+    assert state(recovered.categories) == expected
+    assert Category.snapshot_counts() == counts
+    assert len(recovered.products) == len(journal.products) == 2
+
+
+def test_compaction_and_tail_replay(tmp_path):
+    """Проверяем снимок и чтение только хвоста журнала."""
+    journal = Journal(tmp_path).attach()
+    categories = build_catalog()
+    journal.compact()
+    categories[0].add_product(Product("Poco X6", "Черный", 30000.0, 1))
+    categories[0].find_product("Poco X6").price = 32000.0
+    journal.close()
+    assert sorted(os.listdir(tmp_path)) == ["checkpoint-00000001.bin", "checkpoint.json",
+                                            "journal-00000001.log"]
+    expected = state(categories)
+    counts = Category.snapshot_counts()
+
+    Category.reset_counts()
+    recovered = Journal(tmp_path)
+    recovered.close()
+    assert state(recovered.categories) == expected
+    assert Category.snapshot_counts() == counts
+
+
+def test_automatic_compaction(tmp_path):
+    """Проверяем периодическое сохранение снимка без явного flush()."""
+    checkpoint = tmp_path / "checkpoint.json"
+    with Journal(tmp_path, buffer_size=1, compact_every=5):
+        categories = build_catalog()
+        product = categories[0].find_product("Iphone 15")
+        deadline = time.monotonic() + 10
+        while not checkpoint.exists() and time.monotonic() < deadline:
+            product.quantity += 1
+            time.sleep(0.01)
+        assert checkpoint.exists()
+        product.quantity += 1
+    recovered = Journal(tmp_path)
+    recovered.close()
+    assert state(recovered.categories) == state(categories)
+
+
+def test_snapshot_taken_before_add_is_journaled(tmp_path):
+    """Проверяем, что пакет из снимка не добавляется повторно при воспроизведении."""
+    journal = Journal(tmp_path).attach()
+    category = Category("Кат", "Описание", [Product("Т1", "О1", 10.0, 1)])
+    product = Product("Т2", "О2", 20.0, 2)
+    # Снимок сохраняется, пока добавление товара ждет журнала
+    with journal._lock:
+        writer = threading.Thread(target=category.add_product, args=(product,))
+        writer.start()
+        while len(category) < 2:
+            time.sleep(0.001)
+        journal._flush()
+        journal._compact()
+    writer.join()
+    journal.close()
+    expected = state([category])
+
+    Category.reset_counts()
+    recovered = Journal(tmp_path)
+    recovered.close()
+    assert state(recovered.categories) == expected
+
+
+def test_torn_tail_is_ignored(tmp_path):
+    """Проверяем, что недописанная запись после сбоя пропускается."""
+    with Journal(tmp_path):
+        categories = build_catalog()
+    with open(tmp_path / "journal-00000000.log", "a", encoding="utf-8") as file:
+        file.write('["quantity", 0, 10')
+    recovered = Journal(tmp_path)
+    recovered.close()
+    assert state(recovered.categories) == state(categories)
+
+
+def test_track_existing_category(tmp_path):
+    """Проверяем журналирование категории, созданной до журнала."""
+    category = Category("Кат", "Описание", [Product("Т1", "О1", 10.0, 1)])
+    with Journal(tmp_path) as journal:
+        journal.track(category)
+        category.find_product("Т1").quantity = 5
+    recovered = Journal(tmp_path)
+    recovered.close()
+    assert state(recovered.categories) == [("Кат", ["Т1, 10.0 руб. Остаток: 5 шт."])]
+
+
+def test_forked_workers_do_not_write_journal(tmp_path):
+    """Проверяем, что воркеры merge_feeds не пишут в журнал родителя."""
+    journal_dir = tmp_path / "journal"
+    paths = write_feeds(tmp_path)
+    with Journal(journal_dir, buffer_size=1):
+        category = merge_feeds(paths, "Кат", "Описание", processes=2)
+    expected = state([category])
+    counts = Category.snapshot_counts()
+
+    Category.reset_counts()
+    recovered = Journal(journal_dir)
+    recovered.close()
+    assert state(recovered.categories) == expected
+    assert Category.snapshot_counts() == counts
+    assert len(recovered.products) == len(category)
+
+
+def test_bulk_quantity_changes_journaled(tmp_path):
+    """Проверяем журналирование массового изменения остатков ProductColumns."""
+    columns = ProductColumns([Product("Т1", "О1", 10.0, 1), Product("Т2", "О2", 20.0, 3)])
+    with Journal(tmp_path):
+        category = Category("Кат", "Описание", [columns.row(0), columns.row(1)])
+        columns.adjust_quantities(5)
+        columns.adjust_quantities(-1, mask=[False, True])
+    expected = state([category])
+    assert expected == [("Кат", ["Т1, 10.0 руб. Остаток: 6 шт.", "Т2, 20.0 руб. Остаток: 7 шт."])]
+
+    recovered = Journal(tmp_path)
+    recovered.close()
+    assert state(recovered.categories) == expected
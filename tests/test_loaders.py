@@ -0,0 +1,98 @@
+import io
+import json
+
+import pytest
+
+from src.main import Category, Product
+from src.loaders import batched, iter_products, iter_records, load_into_category
+
+
+CSV_FEED = """name,description,price,quantity
+Iphone 15,"512GB, Gray space",210000.0,8
+Xiaomi Redmi Note 11,"1024GB, Синий",31000,14
+Iphone 15,"512GB, Gray space",215000.0,2
+"""
+
+
+def write_jsonl(path, records):
+    path.write_text("\n".join(json.dumps(record, ensure_ascii=False) for record in records),
+                    encoding="utf-8")
+
+
+def test_batched():
+    """Проверяем разбиение на пакеты."""
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    with pytest.raises(ValueError):
+        list(batched([], 0))
+
+
+def test_iter_records_csv(tmp_path):
+    """Проверяем потоковое чтение CSV с определением формата по расширению."""
+    path = tmp_path / "feed.csv"
+    path.write_text(CSV_FEED, encoding="utf-8")
+    records = list(iter_records(path))
+    assert len(records) == 3
+    assert records[0]["description"] == "512GB, Gray space"
+
+
+def test_iter_products_merges_duplicates(tmp_path):
+    """Проверяем, что дубликаты сливаются по правилам new_product."""
+    path = tmp_path / "feed.csv"
+    path.write_text(CSV_FEED, encoding="utf-8")
+    products = list(iter_products(path, batch_size=2))
+    assert [product.name for product in products] == ["Iphone 15", "Xiaomi Redmi Note 11"]
+    assert products[0].quantity == 10
+    assert products[0].price == 215000.0
+    assert products[1].price == 31000.0
+
+
+def test_load_into_category_jsonl(tmp_path):
+    """Проверяем загрузку JSON Lines в категорию пакетами."""
+    path = tmp_path / "feed.jsonl"
+    write_jsonl(path, [
+        {"name": "Т1", "description": "О1", "price": 10.0, "quantity": 1},
+        {"name": "Т2", "description": "О2", "price": 20.0, "quantity": 2},
+        {"name": "Т1", "description": "О1", "price": 5.0, "quantity": 4},
+    ])
+    category = Category("Кат", "Описание", [Product("Т2", "О2", 25.0, 1)])
+    initial_count = Category.product_count
+
+    assert load_into_category(category, path, batch_size=2) == 1
+    assert Category.product_count == initial_count + 1
+    assert category.products == ["Т2, 25.0 руб. Остаток: 3 шт.", "Т1, 10.0 руб. Остаток: 5 шт."]
+
+
+def test_load_into_category_invalid_records():
+    """Проверяем обработку некорректных записей."""
+    feed = io.StringIO('{"name": "Т1", "price": 10.0}\n'
+                       '{"name": "Т2", "description": "О2", "price": 20.0, "quantity": 2}\n')
+    category = Category("Кат", "Описание", [])
+    with pytest.raises(ValueError, match="Недостаточно данных для создания продукта."):
+        load_into_category(category, feed, fmt="jsonl")
+
+    feed.seek(0)
+    assert load_into_category(category, feed, fmt="jsonl", skip_invalid=True) == 1
+
+
+@pytest.mark.parametrize("price, quantity", [(0, 1), (-5.0, 1), ("0", 1), (10.0, -1)])
+def test_load_into_category_out_of_range(price, quantity):
+    """Проверяем пропуск записей с неположительной ценой или отрицательным остатком."""
+    bad = {"name": "Т1", "description": "О1", "price": price, "quantity": quantity}
+    feed = io.StringIO(json.dumps(bad, ensure_ascii=False) + "\n"
+                       '{"name": "Т2", "description": "О2", "price": 20.0, "quantity": 2}\n')
+    category = Category("Кат", "Описание", [])
+    with pytest.raises(ValueError, match="Т1"):
+        load_into_category(category, feed, fmt="jsonl")
+
+    feed.seek(0)
+    assert load_into_category(category, feed, fmt="jsonl", skip_invalid=True) == 1
+    assert category.products == ["Т2, 20.0 руб. Остаток: 2 шт."]
+
+
+def test_add_products_type_error():
+    """Проверяем, что add_products не меняет категорию при ошибке типа."""
+    category = Category("Кат", "Описание", [])
+    with pytest.raises(TypeError, match="Можно добавлять только объекты класса Product."):
+        category.add_products([Product("Т1", "О1", 1.0, 1), "Не продукт"])
+    assert category.products == []
+    assert category.add_products([Product("Т1", "О1", 1.0, 1)]) == 1
@@ -0,0 +1,49 @@
+import json
+import random
+
+import pytest
+
+from src.main import Category
+from src.parallel import merge_feeds, merge_feeds_serial
+
+
+def write_feeds(tmp_path, files=3, records=200, seed=1):
+    rng = random.Random(seed)
+    paths = []
+    for file_index in range(files):
+        path = tmp_path / f"feed{file_index}.jsonl"
+        lines = [json.dumps({"name": f"Товар {rng.randrange(60)}",
+                             "description": f"Описание {file_index}-{i}",
+                             "price": float(rng.randrange(1, 500)),
+                             "quantity": rng.randrange(0, 10)}, ensure_ascii=False)
+                 for i in range(records)]
+        path.write_text("\n".join(lines), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def snapshot(category):
+    return [(p.name, p.description, p.price, p.quantity) for p in category]
+
+
+def test_parallel_matches_serial(tmp_path):
+    """Проверяем, что параллельное слияние совпадает с последовательным."""
+    paths = write_feeds(tmp_path)
+    Category.reset_counts()
+    serial = merge_feeds_serial(paths, "Кат", "Описание")
+    serial_count = Category.product_count
+
+    Category.reset_counts()
+    parallel = merge_feeds(paths, "Кат", "Описание", processes=2)
+    assert snapshot(parallel) == snapshot(serial)
+    assert Category.product_count == serial_count == len(parallel)
+    assert list(parallel.products) == list(serial.products)
+
+
+def test_parallel_invalid_record(tmp_path):
+    """Проверяем, что некорректная запись приводит к ValueError."""
+    paths = write_feeds(tmp_path, files=2, records=10)
+    with open(paths[1], "a", encoding="utf-8") as file:
+        file.write('\n{"name": "Неполный", "price": 1.0}')
+    with pytest.raises(ValueError, match="Недостаточно данных для создания продукта."):
+        merge_feeds(paths, "Кат", "Описание", processes=2)
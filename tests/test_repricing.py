@@ -0,0 +1,67 @@
+import pytest
+
+from src.main import Category, Product
+from src.repricing import (ApprovePolicy, MaxDropPolicy, RejectPolicy, ReviewQueuePolicy,
+                           reprice)
+
+
+@pytest.fixture
+def category():
+    return Category("Смартфоны", "Описание", [
+        Product("Samsung Galaxy S23 Ultra", "256GB", 180000.0, 5),
+        Product("Iphone 15", "512GB", 210000.0, 8),
+        Product("Xiaomi Redmi Note 11", "1024GB", 31000.0, 14),
+    ])
+
+
+@pytest.fixture(autouse=True)
+def no_input(monkeypatch):
+    """Переоценка не должна обращаться к интерактивному вводу."""
+    def fail(_):
+        raise AssertionError("input() вызван при пакетной переоценке")
+    monkeypatch.setattr('builtins.input', fail)
+
+
+def test_reprice_report(category):
+    """Проверяем распределение обновлений по результатам."""
+    report = reprice(category, {
+        "Samsung Galaxy S23 Ultra": 190000.0,
+        "Iphone 15": 200000.0,
+        "Xiaomi Redmi Note 11": -1,
+        "Неизвестный": 10.0,
+    }, RejectPolicy())
+    assert report.applied == ["Samsung Galaxy S23 Ultra"]
+    assert report.rejected == ["Iphone 15"]
+    assert report.invalid == ["Xiaomi Redmi Note 11"]
+    assert report.missing == ["Неизвестный"]
+    assert category.find_product("Iphone 15").price == 210000.0
+    assert category.products[0] == "Samsung Galaxy S23 Ultra, 190000.0 руб. Остаток: 5 шт."
+
+
+def test_max_drop_policy(category):
+    """Проверяем автоматическое согласование понижения до X%."""
+    report = reprice(category, [("Iphone 15", 199500.0), ("Xiaomi Redmi Note 11", 20000.0)],
+                     MaxDropPolicy(5))
+    assert report.applied == ["Iphone 15"]
+    assert report.rejected == ["Xiaomi Redmi Note 11"]
+
+
+def test_review_queue_policy(category):
+    """Проверяем отложенное согласование понижения цены."""
+    queue = ReviewQueuePolicy()
+    reprice(category, {"Iphone 15": 150000.0}, MaxDropPolicy(10, fallback=queue))
+    product = category.find_product("Iphone 15")
+    assert product.price == 210000.0
+    assert queue.pending == [(product, 210000.0, 150000.0)]
+
+    assert queue.approve_all() == 1
+    assert product.price == 150000.0
+    assert queue.pending == []
+
+
+def test_product_price_policy(monkeypatch):
+    """Проверяем замену политики сеттера price."""
+    product = Product("Тест", "О", 100.0, 5)
+    monkeypatch.setattr(Product, "price_policy", ApprovePolicy())
+    product.price = 50.0
+    assert product.price == 50.0
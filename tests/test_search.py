@@ -0,0 +1,65 @@
+import pytest
+
+from src.main import Category, Product
+from src.search import SearchIndex, tokenize
+
+
+@pytest.fixture
+def categories():
+    smartphones = Category("Смартфоны", "Описание", [
+        Product("Samsung Galaxy S23 Ultra", "256GB, Серый цвет, 200MP камера", 180000.0, 5),
+        Product("Iphone 15", "512GB, Gray space", 210000.0, 8),
+        Product("Xiaomi Redmi Note 11", "1024GB, Синий", 31000.0, 14),
+    ])
+    tvs = Category("Телевизоры", "Описание", [
+        Product('55" QLED 4K', "Фоновая подсветка, серый корпус", 123000.0, 7),
+    ])
+    return smartphones, tvs
+
+
+def test_tokenize():
+    """Проверяем токенизацию кириллицы и латиницы."""
+    assert tokenize("256GB, Серый цвет, Ёлка") == ["256gb", "серый", "цвет", "елка"]
+
+
+def test_search_and_or(categories):
+    """Проверяем запросы AND и OR."""
+    index = SearchIndex(categories)
+    assert [p.name for p in index.search("серый 256gb")] == ["Samsung Galaxy S23 Ultra"]
+    assert [p.name for p in index.search("Синий gray", mode="or")] == [
+        "Iphone 15", "Xiaomi Redmi Note 11"]
+    assert index.search("синий gray") == []
+
+
+def test_search_prefix_and_scope(categories):
+    """Проверяем поиск по префиксу и ограничение категорией."""
+    smartphones, tvs = categories
+    index = SearchIndex(categories)
+    assert len(index.search("сер", prefix=True)) == 2
+    assert [p.name for p in index.search("сер", prefix=True, category=tvs)] == ['55" QLED 4K']
+    assert index.search("сер") == []
+
+
+def test_search_ranking(categories):
+    """Проверяем, что совпадение в названии весит больше, чем в описании."""
+    category = Category("Кат", "Описание", [
+        Product("Чехол", "Для iphone", 1000.0, 1),
+        Product("Iphone 14", "Смартфон", 90000.0, 1),
+    ])
+    index = SearchIndex([category])
+    assert [p.name for p in index.search("iphone")] == ["Iphone 14", "Чехол"]
+
+
+def test_search_follows_category_changes(categories):
+    """Проверяем обновление индекса при добавлении и слиянии товаров."""
+    smartphones, tvs = categories
+    index = SearchIndex(categories)
+    smartphones.merge_product({"name": "Poco X6", "description": "Черный", "price": 30000.0,
+                               "quantity": 2})
+    smartphones.merge_product({"name": "Poco X6", "description": "Черный", "price": 31000.0,
+                               "quantity": 1})
+    assert [p.quantity for p in index.search("poco")] == [3]
+
+    tvs.add_product(smartphones.find_product("Iphone 15"))
+    assert len(index.search("iphone", category=tvs)) == 1
+    assert len(index) == 5
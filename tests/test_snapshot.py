@@ -0,0 +1,83 @@
+import mmap
+
+import pytest
+
+from src.main import Category, Product
+from src import snapshot as snapshot_module
+from src.snapshot import load_catalog, save_catalog
+
+
+@pytest.fixture
+def catalog():
+    Category.reset_counts()
+    shared = Product("Iphone 15", "512GB, Gray space", 210000.0, 8)
+    smartphones = Category("Смартфоны", "Описание смартфонов", [
+        Product("Samsung Galaxy S23 Ultra", "256GB, Серый цвет, 200MP камера", 180000.0, 5),
+        shared,
+    ])
+    gifts = Category("Подарки", "Описание подарков", [shared, Product("Открытка", "Бумажная", 100, 0)])
+    return smartphones, gifts
+
+
+def test_snapshot_round_trip(tmp_path, catalog):
+    """Проверяем сохранение и загрузку категорий, товаров и счетчиков."""
+    path = tmp_path / "catalog.bin"
+    extra = Product("Без категории", "Описание", 1.5, 3)
+    assert save_catalog(path, catalog, [extra]) == 4
+    counts = Category.snapshot_counts()
+    Category.reset_counts()
+
+    with load_catalog(path) as snapshot:
+        assert Category.snapshot_counts() == counts
+        assert len(snapshot.products) == 4
+        assert len(snapshot.categories) == 2
+        assert snapshot.products.materialized == 0
+
+        smartphones, gifts = snapshot.categories
+        assert Category.snapshot_counts() == counts
+        assert smartphones.name == "Смартфоны"
+        assert smartphones.products == list(catalog[0].products)
+        assert gifts.products == ["Iphone 15, 210000.0 руб. Остаток: 8 шт.",
+                                  "Открытка, 100 руб. Остаток: 0 шт."]
+        # Общий товар остается одним объектом в обеих категориях
+        assert gifts.find_product("Iphone 15") is smartphones.find_product("Iphone 15")
+        assert snapshot.products[0].name == "Без категории"
+
+
+def test_snapshot_lazy_products(tmp_path, catalog):
+    """Проверяем ленивое создание товаров."""
+    path = tmp_path / "catalog.bin"
+    save_catalog(path, catalog)
+    with load_catalog(path, restore_counts=False) as snapshot:
+        product = snapshot.products[-1]
+        assert product.price == 100
+        assert snapshot.products.materialized == 1
+        assert snapshot.products[2] is product
+
+
+def test_snapshot_invalid_file(tmp_path, monkeypatch):
+    """Проверяем отказ загружать посторонний файл."""
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a catalog" * 10)
+    with pytest.raises(ValueError, match="Файл не является снимком каталога."):
+        load_catalog(path)
+
+    # Файл короче заголовка, в том числе начинающийся с сигнатуры;
+    # открытые файл и отображение должны быть закрыты
+    opened = []
+
+    def tracking(factory):
+        def wrapper(*args, **kwargs):
+            resource = factory(*args, **kwargs)
+            opened.append(resource)
+            return resource
+        return wrapper
+
+    monkeypatch.setattr(snapshot_module, "open", tracking(open), raising=False)
+    monkeypatch.setattr(snapshot_module.mmap, "mmap", tracking(mmap.mmap))
+    for content in (b"OOP", b"OOPCAT01" + b"\0" * 4):
+        path.write_bytes(content)
+        with pytest.raises(ValueError, match="Файл не является снимком каталога."):
+            load_catalog(path)
+    assert len(opened) == 4
+    assert all(resource.closed for resource in opened)